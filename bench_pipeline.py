@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Sprite Pipeline Benchmark
+Times each stage of sprite normalization (decode, content bounds, resize,
+canvas compose, encode) on synthetic RGBA sprites of controlled size,
+fill and count plus the real Elon and Trump sources. Reports megapixels/s,
+sprites/s and peak memory per stage, and compares against a saved baseline.
+"""
+
+import gc
+import io
+import os
+import re
+import sys
+import json
+import time
+import ctypes
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import multiprocessing
+import PIL
+from PIL import Image
+import numpy as np
+from sprite_pipeline import (CHARACTERS, CANVAS_WIDTH_RATIO, CANVAS_HEIGHT_RATIO, ENCODE_PROFILES,
+                             DEFAULT_ENCODE, RESAMPLE_PROFILES, DEFAULT_RESAMPLE, find_content_bounds, pose_scale,
+                             encode_image, resize_sprite)
+
+RESULTS_FILE = 'bench_results.json'
+BASELINE_FILE = 'bench_baseline.json'
+
+REFERENCE_HEIGHT = 728  # Elon's standing height, the v3 reference
+STAGES = ['decode', 'bounds', 'resize', 'compose', 'encode']
+
+DEFAULT_SIZE = '1408x792'  # Matches the real source sprites
+DEFAULT_FILLS = '0.1,0.4'
+DEFAULT_COUNT = 12
+MAX_FILL = 0.78  # An ellipse can't cover more of its bounding box than pi/4
+
+TOLERANCE = 0.10  # Relative slowdown or memory growth reported as a regression
+
+def read_rss_kb(field):
+    """A memory figure from /proc/self/status in KB, or None off Linux."""
+    try:
+        with open('/proc/self/status') as f:
+            match = re.search(rf'^{field}:\s+(\d+) kB', f.read(), re.MULTILINE)
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter; False if the platform can't."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def release_free_memory():
+    """
+    Hand freed heap pages back to the OS (glibc only), so memory an earlier
+    allocation left resident can't be reused by a stage without showing up in its peak.
+    """
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+def synthetic_sprite(width, height, fill, rng):
+    """An RGBA sprite whose opaque ellipse covers fill of the image, sitting on the bottom edge."""
+    fill = min(fill, MAX_FILL)
+    radius_scale = np.sqrt(4 * fill / np.pi)
+    rx, ry = width / 2 * radius_scale, height / 2 * radius_scale
+
+    y, x = np.mgrid[0:height, 0:width]
+    inside = ((x - width / 2) / rx) ** 2 + ((y - (height - ry)) / ry) ** 2 <= 1
+
+    # Smooth shading plus grain, so encoders see something like painted art
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    rgba[..., 0] = (x * 255 // max(width - 1, 1)).astype(np.uint8)
+    rgba[..., 1] = (y * 255 // max(height - 1, 1)).astype(np.uint8)
+    rgba[..., 2] = rng.integers(96, 160, size=(height, width), dtype=np.uint8)
+    rgba[..., 3] = np.where(inside, 255, 0)
+    return Image.fromarray(rgba, 'RGBA')
+
+def write_synthetic_set(directory, size, fill, count, seed=0):
+    """Write count synthetic sprites as PNG files; returns their paths."""
+    width, height = size
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"synthetic_{i:02d}.png")
+        synthetic_sprite(width, height, fill, rng).save(path)
+        paths.append(path)
+    return paths
+
+def real_set(base_dir, input_dir):
+    """Source sprite paths for one character."""
+    path = os.path.join(base_dir, input_dir)
+    return [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.lower().endswith('.png')]
+
+def stage_decode(paths):
+    """Decode every source into an RGBA buffer, as load_source does."""
+    images = []
+    for path in paths:
+        image = Image.open(path)
+        if image.mode != 'RGBA':
+            image = image.convert('RGBA')
+        else:
+            image.load()
+        images.append(image)
+    return images
+
+def stage_bounds(images):
+    """Content bounds of every decoded sprite."""
+    return [find_content_bounds(image) for image in images]
+
+def stage_resize(images, bounds, paths, resample=DEFAULT_RESAMPLE):
+    """Crop to content and resize to the reference height, as the v3 renderer does."""
+    resized = []
+    for image, box, path in zip(images, bounds, paths):
+        if box is None:
+            resized.append(image)
+            continue
+        cropped = image.crop(box)
+        scale = REFERENCE_HEIGHT / cropped.height * pose_scale(os.path.basename(path))
+        size = (max(1, int(cropped.width * scale)), max(1, int(cropped.height * scale)))
+        resized.append(resize_sprite(cropped, size, resample))
+    return resized
+
+def stage_compose(resized):
+    """Paste every sprite bottom-centred on the shared v3 canvas."""
+    canvas_size = (int(REFERENCE_HEIGHT * CANVAS_WIDTH_RATIO), int(REFERENCE_HEIGHT * CANVAS_HEIGHT_RATIO))
+    canvases = []
+    for sprite in resized:
+        canvas = Image.new('RGBA', canvas_size, (0, 0, 0, 0))
+        canvas.paste(sprite, ((canvas_size[0] - sprite.width) // 2, canvas_size[1] - sprite.height))
+        canvases.append(canvas)
+    return canvases
+
+def stage_encode(canvases, encode):
+    """Encode every canvas in memory; returns the encoded sizes."""
+    outputs = []
+    for canvas in canvases:
+        buffer = io.BytesIO()
+        encode_image(canvas, buffer, encode)
+        outputs.append(buffer.getbuffer().nbytes)
+    return outputs
+
+def stage_call(stage, paths, encode, resample=DEFAULT_RESAMPLE):
+    """(function, args) for one stage, running the stages before it to build its inputs."""
+    if stage == 'decode':
+        return stage_decode, (paths,)
+    images = stage_decode(paths)
+    if stage == 'bounds':
+        return stage_bounds, (images,)
+    bounds = stage_bounds(images)
+    if stage == 'resize':
+        return stage_resize, (images, bounds, paths, resample)
+    resized = stage_resize(images, bounds, paths, resample)
+    if stage == 'compose':
+        return stage_compose, (resized,)
+    return stage_encode, (stage_compose(resized), encode)
+
+def stage_peak_mb(stage, paths, encode, resample=DEFAULT_RESAMPLE):
+    """
+    Peak memory of one stage above what was resident when it started, in MB.
+    Runs in a fresh worker process: its inputs are rebuilt there and freed
+    heap is trimmed first, so the peak isn't hidden by memory an earlier
+    stage or run left resident for reuse.
+    """
+    func, args = stage_call(stage, paths, encode, resample)
+    gc.collect()
+    release_free_memory()
+    if reset_peak_rss():
+        start_rss = read_rss_kb('VmRSS')
+        func(*args)
+        return max(0, read_rss_kb('VmHWM') - start_rss) / 1024
+    # Only Python and numpy allocations are traced here, not Pillow's buffers
+    tracemalloc.start()
+    func(*args)
+    peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return peak_mb
+
+def measure_stage(func, *args):
+    """Run one stage once. Returns (result, seconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def measure_peaks(paths, encode, resample=DEFAULT_RESAMPLE):
+    """{stage: peak MB}, each stage measured in its own fresh process."""
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        return {stage: pool.apply(stage_peak_mb, (stage, paths, encode, resample)) for stage in STAGES}
+
+def run_set(paths, encode, repeat, resample=DEFAULT_RESAMPLE):
+    """
+    Benchmark every stage on one sprite set, keeping each stage's fastest run.
+    Peak memory is measured once per stage, outside the timed runs.
+    """
+    best = {stage: None for stage in STAGES}
+
+    for _ in range(repeat):
+        runs = {}
+        images, runs['decode'] = measure_stage(stage_decode, paths)
+        bounds, runs['bounds'] = measure_stage(stage_bounds, images)
+        resized, runs['resize'] = measure_stage(stage_resize, images, bounds, paths, resample)
+        canvases, runs['compose'] = measure_stage(stage_compose, resized)
+        _, runs['encode'] = measure_stage(stage_encode, canvases, encode)
+
+        # Megapixels each stage reads
+        pixels = {
+            'decode': sum(image.width * image.height for image in images),
+            'bounds': sum(image.width * image.height for image in images),
+            'resize': sum((box[2] - box[0]) * (box[3] - box[1]) if box else 0 for box in bounds),
+            'compose': sum(canvas.width * canvas.height for canvas in canvases),
+            'encode': sum(canvas.width * canvas.height for canvas in canvases)
+        }
+        for stage in STAGES:
+            seconds = runs[stage]
+            if best[stage] is None or seconds < best[stage]['seconds']:
+                best[stage] = {
+                    'seconds': round(seconds, 4),
+                    'mp_per_s': round(pixels[stage] / 1e6 / max(seconds, 1e-9), 1),
+                    'sprites_per_s': round(len(paths) / max(seconds, 1e-9), 1)
+                }
+
+    for stage, peak_mb in measure_peaks(paths, encode, resample).items():
+        best[stage]['peak_mb'] = round(peak_mb, 1)
+
+    return {
+        'sprites': len(paths),
+        'megapixels': round(sum(image.width * image.height for image in images) / 1e6, 1),
+        'stages': best
+    }
+
+def compare(results, baseline, tolerance):
+    """Print per-stage changes against a baseline; returns the number of regressions."""
+    regressions = 0
+    for set_name, current in results['sets'].items():
+        previous = baseline.get('sets', {}).get(set_name)
+        if previous is None:
+            print(f"\n  {set_name}: not in baseline")
+            continue
+
+        print(f"\n  {set_name}:")
+        for stage, stats in current['stages'].items():
+            before = previous['stages'].get(stage)
+            if before is None:
+                continue
+            speed = stats['sprites_per_s'] / max(before['sprites_per_s'], 1e-9) - 1
+            memory = stats['peak_mb'] - before['peak_mb']
+            flags = []
+            if speed < -tolerance:
+                flags.append("SLOWER")
+            if memory > max(before['peak_mb'] * tolerance, 1.0):
+                flags.append("MORE MEMORY")
+            regressions += bool(flags)
+            note = f"  <- {', '.join(flags)}" if flags else ""
+            print(f"    {stage:<8} {speed * 100:+6.1f}% sprites/s, {memory:+7.1f} MB peak{note}")
+    return regressions
+
+def main():
+    """Benchmark the pipeline stages and optionally compare against a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark the sprite normalization stages")
+    parser.add_argument('--size', default=DEFAULT_SIZE, help=f"synthetic sprite WxH (default: {DEFAULT_SIZE})")
+    parser.add_argument('--fill', default=DEFAULT_FILLS,
+                        help=f"comma-separated synthetic content fill ratios (default: {DEFAULT_FILLS})")
+    parser.add_argument('--count', type=int, default=DEFAULT_COUNT,
+                        help=f"sprites per synthetic set (default: {DEFAULT_COUNT})")
+    parser.add_argument('--no-synthetic', action='store_true', help="skip the synthetic sets")
+    parser.add_argument('--no-real', action='store_true', help="skip the real character sets")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"encode profile for the encode stage (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--resample', choices=sorted(RESAMPLE_PROFILES), default=DEFAULT_RESAMPLE,
+                        help=f"resample profile for the resize stage (default: {DEFAULT_RESAMPLE})")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per set, best kept (default: 3)")
+    parser.add_argument('--output', default=RESULTS_FILE, help=f"JSON results (default: {RESULTS_FILE})")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help=f"baseline JSON (default: {BASELINE_FILE})")
+    parser.add_argument('--save-baseline', action='store_true', help="also save these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE,
+                        help=f"relative change reported as a regression (default: {TOLERANCE})")
+    args = parser.parse_args()
+
+    try:
+        size = tuple(int(value) for value in args.size.lower().split('x'))
+        fills = [float(value) for value in args.fill.split(',')]
+    except ValueError:
+        parser.error("--size must look like 1408x792 and --fill like 0.1,0.4")
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print("Sprite Pipeline Benchmark")
+    print("=" * 50)
+
+    sets = {}
+    temp_dir = tempfile.TemporaryDirectory()
+    if not args.no_synthetic:
+        for fill in fills:
+            directory = os.path.join(temp_dir.name, f"fill{fill}")
+            os.makedirs(directory)
+            name = f"synthetic-{size[0]}x{size[1]}-fill{fill:g}"
+            sets[name] = write_synthetic_set(directory, size, fill, args.count)
+    if not args.no_real:
+        for char_name, input_dir in CHARACTERS:
+            if os.path.exists(os.path.join(base_dir, input_dir)):
+                sets[char_name] = real_set(base_dir, input_dir)
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'pillow': PIL.__version__,
+            'numpy': np.__version__,
+            'machine': f"{platform.system()} {platform.machine()}",
+            'encode': args.encode,
+            'resample': args.resample,
+            'repeat': args.repeat,
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'sets': {}
+    }
+
+    for name, paths in sets.items():
+        print(f"\n  {name} ({len(paths)} sprites):")
+        stats = run_set(paths, args.encode, args.repeat, args.resample)
+        results['sets'][name] = stats
+        for stage, stage_stats in stats['stages'].items():
+            print(f"    {stage:<8} {stage_stats['seconds'] * 1000:8.1f} ms  "
+                  f"{stage_stats['mp_per_s']:8.1f} MP/s  {stage_stats['sprites_per_s']:8.1f} sprites/s  "
+                  f"{stage_stats['peak_mb']:7.1f} MB peak")
+    temp_dir.cleanup()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    regressions = 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline['meta']['time']}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n  {regressions} stage(s) regressed by more than {args.tolerance:.0%}")
+
+    print("\n" + "=" * 50)
+    print(f"Results saved to {args.output}")
+    if regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
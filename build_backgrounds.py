@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Stage Background Builder
+Pre-scales the stage art to the game canvas at a few densities and writes
+each as an opaque encoding (JPEG by default, no alpha channel), so the game
+downloads a fraction of the source PNG and drawBackground() blits it 1:1
+instead of rescaling the full source every frame. With --split the static
+scenery is cut off where the arena floor starts, since drawBackground()
+paints its opaque floor layer over those rows every frame anyway.
+"""
+
+import io
+import os
+import json
+import argparse
+import numpy as np
+from PIL import Image
+from sprite_pipeline import RESAMPLE_PROFILES, DEFAULT_RESAMPLE, resize_sprite
+from resample_report import psnr
+
+# Stage art: (name, source image)
+STAGES = [
+    ('starbase', 'ChatGPT Image Jul 31, 2025, 08_46_53 PM.png'),  # The stage index.html draws
+    ('factory', 'level1-factory.png'),
+    ('texas', 'starbase_texas_sign.png')
+]
+
+OUTPUT_DIR = 'backgrounds'
+INDEX_FILE = 'backgrounds.json'
+
+BASE_WIDTH = 960   # Canvas size in index.html - keep in sync
+BASE_HEIGHT = 540
+GROUND_Y = 440     # drawBackground() paints the floor from here down - keep in sync with index.html
+
+# Device pixels per canvas pixel each tier is built for. The canvas backing
+# store is BASE_WIDTH wide, so pickTier() never asks for more than 1x.
+DEFAULT_TIERS = [0.5, 1]
+
+# Opaque encodings
+#   format    - Pillow format
+#   extension - file extension
+#   options   - Pillow save() options
+BACKGROUND_ENCODES = {
+    'jpeg': {'format': 'jpeg', 'extension': 'jpg', 'options': {'quality': 90, 'optimize': True, 'progressive': True}},
+    'webp': {'format': 'webp', 'extension': 'webp', 'options': {'quality': 90, 'method': 6}},
+    'png': {'format': 'png', 'extension': 'png', 'options': {'optimize': True}}
+}
+DEFAULT_ENCODE = 'jpeg'
+
+def tier_size(density, split=False):
+    """Pixel size of a tier; split tiers stop at the floor line."""
+    height = GROUND_Y if split else BASE_HEIGHT
+    return round(BASE_WIDTH * density), round(height * density)
+
+def render_tier(source, density, split=False, resample=DEFAULT_RESAMPLE):
+    """
+    The source stretched to the canvas at density, as drawBackground() has
+    always drawn it, then cut at the floor line if split. Returns an RGB image.
+    """
+    width, _ = tier_size(density)
+    full = resize_sprite(source, (width, round(BASE_HEIGHT * density)), resample)
+    return full.crop((0, 0) + tier_size(density, split))
+
+def encode_background(image, encode=DEFAULT_ENCODE):
+    """Encode an RGB image with a background encode profile; returns the bytes."""
+    profile = BACKGROUND_ENCODES[encode]
+    buffer = io.BytesIO()
+    image.save(buffer, format=profile['format'].upper(), **profile['options'])
+    return buffer.getvalue()
+
+def build_stage(base_dir, output_dir, name, source_path, densities, split=False, encode=DEFAULT_ENCODE,
+                resample=DEFAULT_RESAMPLE):
+    """
+    Write one stage's tiers to output_dir and print what they save.
+    Returns the stage's index entry, or None if the source is missing.
+    """
+    path = os.path.join(base_dir, source_path)
+    if not os.path.exists(path):
+        print(f"\n  Skipping {name}: {source_path} not found")
+        return None
+
+    with Image.open(path) as image:
+        # Backgrounds are drawn first over nothing, so any alpha is dropped
+        source = image.convert('RGB')
+    source_bytes = os.path.getsize(path)
+    source_pixels = source.width * source.height
+    extension = BACKGROUND_ENCODES[encode]['extension']
+
+    print(f"\n  {name}: {source_path} ({source.width}x{source.height}, {source_bytes / 1024:.0f} KB, "
+          f"{source.mode if image.mode == 'RGB' else image.mode + ' -> RGB'})")
+
+    tiers = []
+    for density in densities:
+        width, height = tier_size(density, split)
+        if width > source.width:
+            print(f"    {density:g}x: skipped, {width}px is wider than the source")
+            continue
+        tier = render_tier(source, density, split, resample)
+        data = encode_background(tier, encode)
+        filename = f"{name}@{density:g}x.{extension}"
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            f.write(data)
+
+        with Image.open(io.BytesIO(data)) as decoded:
+            quality = psnr(np.asarray(tier, dtype=np.float64), np.asarray(decoded.convert('RGB'), dtype=np.float64))
+        print(f"    {density:g}x: {width}x{height}, {len(data) / 1024:.0f} KB "
+              f"({100 * len(data) / source_bytes:.1f}% of the source bytes, "
+              f"{100 * width * height / source_pixels:.1f}% of its pixels), PSNR {quality:.1f} dB")
+        tiers.append({'density': density, 'file': filename, 'width': width, 'height': height, 'bytes': len(data)})
+
+    return {
+        'source': source_path,
+        'sourceSize': f"{source.width}x{source.height}",
+        'sourceBytes': source_bytes,
+        'split': split,
+        'tiers': tiers
+    }
+
+def main():
+    """Build the background tiers for every stage."""
+    parser = argparse.ArgumentParser(description="Pre-scale stage backgrounds to opaque canvas-sized tiers")
+    parser.add_argument('--tiers', default=','.join(f"{t:g}" for t in DEFAULT_TIERS),
+                        help="comma-separated densities to build (default: %(default)s)")
+    parser.add_argument('--split', action='store_true',
+                        help=f"keep only the scenery above the floor line (y < {GROUND_Y}); the game's floor "
+                             f"layer covers the rest")
+    parser.add_argument('--encode', choices=sorted(BACKGROUND_ENCODES), default=DEFAULT_ENCODE,
+                        help=f"opaque encoding (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--resample', choices=sorted(RESAMPLE_PROFILES), default=DEFAULT_RESAMPLE,
+                        help=f"downscale strategy (default: {DEFAULT_RESAMPLE})")
+    args = parser.parse_args()
+    densities = [float(t) for t in args.tiers.split(',') if t.strip()]
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = os.path.join(base_dir, OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("Stage Background Builder")
+    print("=" * 50)
+    print(f"Canvas {BASE_WIDTH}x{BASE_HEIGHT}, {args.encode}{', split at the floor line' if args.split else ''}")
+
+    stages = {}
+    for name, source_path in STAGES:
+        stage = build_stage(base_dir, output_dir, name, source_path, densities, args.split, args.encode,
+                            args.resample)
+        if stage is not None:
+            stages[name] = stage
+
+    index = {'version': 1, 'canvas': f"{BASE_WIDTH}x{BASE_HEIGHT}", 'stages': stages}
+    with open(os.path.join(output_dir, INDEX_FILE), 'w') as f:
+        json.dump(index, f, indent=2)
+
+    source_bytes = sum(stage['sourceBytes'] for stage in stages.values())
+    largest = [max(stage['tiers'], key=lambda tier: tier['density']) for stage in stages.values() if stage['tiers']]
+    print(f"\n  Download at the sharpest tier: {source_bytes / 1024:.0f} KB -> "
+          f"{sum(tier['bytes'] for tier in largest) / 1024:.0f} KB for {len(largest)} stage(s)")
+
+    print("\n" + "=" * 50)
+    print(f"Index saved to {os.path.join(OUTPUT_DIR, INDEX_FILE)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Production Build
+Writes dist/ for GitHub Pages: index.html with its inline script and style
+minified (console.log debug output stripped with --strip-logs), the asset
+manifest inlined so no fetch gates start-up, small critical assets inlined as
+data URIs, preload hints for the atlas and collision JSON and the background
+tier, and the content-hashed assets from hash_assets.py alongside.
+"""
+
+import os
+import re
+import json
+import gzip
+import base64
+import argparse
+import mimetypes
+from hash_assets import MANIFEST_FILE, ATLAS_DIR, BACKGROUND_DIR, build_assets
+from build_backgrounds import STAGES, INDEX_FILE as BACKGROUND_INDEX
+
+OUTPUT_DIR = 'dist'
+PAGE = 'index.html'
+
+# Small files the first frame waits for (loadBackground() awaits the background index)
+CRITICAL_ASSETS = ['trump1/cash.png', 'backgrounds/backgrounds.json']
+INLINE_LIMIT_KB = 64  # Bigger critical files stay separate requests
+
+# JSON the page fetches alongside the atlases; preloaded rather than inlined,
+# since base64 grows it by a third and compresses badly
+COLLISION_DATA = ['collision/boxes.json', 'collision/masks.json']
+
+BACKGROUND_DENSITY = 1.0  # The background tier pickTier() chooses while the canvas is BASE_WIDTH wide
+
+STRIPPED_CONSOLE = ('log', 'debug', 'info')  # console.warn and console.error are kept
+
+# Keywords after which '/' starts a regex literal rather than a division
+REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw', 'case', 'do',
+                  'else', 'yield', 'await'}
+WORD_CHARS = re.compile(r'[\w$]')
+
+def scan_js(source, start=0, nested=False):
+    """
+    Split JavaScript into (kind, text) tokens: space, newline, comment, string,
+    template, regex, word or punct. Strings, templates and regexes are kept
+    whole so their contents are never touched. With nested=True scanning stops
+    at the '}' closing a template's ${...}. Returns (tokens, end index).
+    """
+    tokens = []
+    depth = 0
+    previous = None  # Last significant token, to tell a regex from a division
+    i = start
+    n = len(source)
+    while i < n:
+        c = source[i]
+        if c in ' \t\r\n':
+            j = i
+            while j < n and source[j] in ' \t\r\n':
+                j += 1
+            tokens.append(('newline' if '\n' in source[i:j] else 'space', source[i:j]))
+            i = j
+            continue
+
+        if source.startswith('//', i):
+            j = source.find('\n', i)
+            j = n if j == -1 else j
+            tokens.append(('comment', source[i:j]))
+            i = j
+            continue
+        if source.startswith('/*', i):
+            j = source.index('*/', i + 2) + 2
+            tokens.append(('comment', source[i:j]))
+            i = j
+            continue
+
+        if c in '\'"':
+            j = i + 1
+            while source[j] != c:
+                j += 2 if source[j] == '\\' else 1
+            token = ('string', source[i:j + 1])
+            i = j + 1
+        elif c == '`':
+            j = i + 1
+            while source[j] != '`':
+                if source[j] == '\\':
+                    j += 2
+                elif source.startswith('${', j):
+                    _, j = scan_js(source, j + 2, nested=True)
+                    j += 1
+                else:
+                    j += 1
+            token = ('template', source[i:j + 1])
+            i = j + 1
+        elif c == '/' and (previous is None
+                           or (previous[0] == 'punct' and previous[1] not in ')]}')
+                           or (previous[0] == 'word' and previous[1] in REGEX_KEYWORDS)):
+            j = i + 1
+            in_class = False
+            while in_class or source[j] != '/':
+                if source[j] == '\\':
+                    j += 1
+                elif source[j] == '[':
+                    in_class = True
+                elif source[j] == ']':
+                    in_class = False
+                j += 1
+            j += 1
+            while j < n and source[j].isalpha():
+                j += 1
+            token = ('regex', source[i:j])
+            i = j
+        elif WORD_CHARS.match(c):
+            j = i
+            while j < n and WORD_CHARS.match(source[j]):
+                j += 1
+            token = ('word', source[i:j])
+            i = j
+        else:
+            if c == '{':
+                depth += 1
+            elif c == '}':
+                if nested and depth == 0:
+                    return tokens, i
+                depth -= 1
+            token = ('punct', c)
+            i += 1
+
+        tokens.append(token)
+        previous = token
+    return tokens, i
+
+def strip_console(tokens, methods=STRIPPED_CONSOLE):
+    """
+    Remove console.<method>(...) calls. A call that is a statement of its own
+    goes entirely; anywhere else (e.g. an arrow body) it becomes `void 0`, so
+    the surrounding code still parses. Returns (tokens, calls removed).
+    """
+    significant = [index for index, (kind, _) in enumerate(tokens) if kind not in ('space', 'newline', 'comment')]
+    result = []
+    removed = 0
+    copied = 0  # tokens[:copied] are already in result
+    position = 0
+    while position < len(significant) - 3:
+        index = significant[position]
+        call = [tokens[significant[position + k]][1] for k in range(4)]
+        before = tokens[significant[position - 1]][1] if position else None
+        if call[0] != 'console' or call[1] != '.' or call[2] not in methods or call[3] != '(' or before == '.':
+            position += 1
+            continue
+
+        # Find the closing parenthesis; strings and templates are single tokens
+        depth = 0
+        end = position + 3
+        while True:
+            text = tokens[significant[end]][1]
+            if tokens[significant[end]][0] == 'punct':
+                depth += text in '([{'
+                depth -= text in ')]}'
+            if depth == 0:
+                break
+            end += 1
+
+        result.extend(tokens[copied:index])
+        if before is None or before in (';', '{', '}'):
+            # Its own statement: drop it with its semicolon
+            if end + 1 < len(significant) and tokens[significant[end + 1]][1] == ';':
+                end += 1
+        else:
+            result.extend([('word', 'void'), ('space', ' '), ('word', '0')])
+        copied = significant[end] + 1
+        position = end + 1
+        removed += 1
+
+    result.extend(tokens[copied:])
+    return result, removed
+
+def needs_space(left, right):
+    """Whether two adjacent tokens would merge or change meaning without whitespace between them."""
+    a, b = left[-1], right[0]
+    if WORD_CHARS.match(a) and WORD_CHARS.match(b):
+        return True
+    if a in '+-' and b == a:
+        return True  # a - -b, a + +b
+    if a == '/' and b in '/*':
+        return True  # Would start a comment
+    return left.isdigit() and b == '.'  # 1 .toFixed()
+
+def minify_js(source, strip_logs=False):
+    """
+    Drop comments and indentation and collapse whitespace. Line breaks are
+    kept (one per group) so automatic semicolon insertion sees the same code.
+    Returns (minified source, console calls stripped).
+    """
+    tokens, _ = scan_js(source)
+    removed = 0
+    if strip_logs:
+        tokens, removed = strip_console(tokens)
+
+    output = []
+    gap = None  # Whitespace seen since the last token: None, ' ' or '\n'
+    for kind, text in tokens:
+        if kind in ('space', 'newline', 'comment'):
+            if kind == 'newline' or (kind == 'comment' and '\n' in text):
+                gap = '\n'
+            elif gap is None:
+                gap = ' '
+            continue
+        if output and gap == '\n':
+            output.append('\n')
+        elif output and gap == ' ' and needs_space(output[-1], text):
+            output.append(' ')
+        output.append(text)
+        gap = None
+    return ''.join(output), removed
+
+def minify_css(source):
+    """Drop comments and collapse whitespace around CSS punctuation (strings are left alone)."""
+    parts = re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', source)
+    for index in range(0, len(parts), 2):
+        css = re.sub(r'/\*.*?\*/', '', parts[index], flags=re.S)
+        css = re.sub(r'\s+', ' ', css)
+        css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+        css = re.sub(r':\s+', ':', css)  # Spaces before ':' can be descendant selectors, so only after
+        parts[index] = css.replace(';}', '}')
+    return ''.join(parts).strip()
+
+def minify_markup(source):
+    """Drop HTML comments, indentation and blank lines."""
+    source = re.sub(r'<!--.*?-->', '', source, flags=re.S)
+    return '\n'.join(line.strip() for line in source.splitlines() if line.strip())
+
+def data_uri(path):
+    """A file as a base64 data: URI."""
+    mime = 'application/json' if path.endswith('.json') else mimetypes.guess_type(path)[0]
+    with open(path, 'rb') as f:
+        return f"data:{mime};base64,{base64.b64encode(f.read()).decode('ascii')}"
+
+def build_page(html, manifest, preloads, strip_logs):
+    """
+    Minify the page and put the manifest and preload hints in its head.
+    Returns (page, stats) with stats on the script, style and stripped calls.
+    """
+    stats = {'script': [0, 0], 'style': [0, 0], 'head': [0, 0], 'console_calls': 0}
+
+    def replace(match):
+        opening, body, closing = match.groups()
+        if opening.startswith('<style'):
+            minified = minify_css(body)
+            kind = 'style'
+        else:
+            minified, removed = minify_js(body, strip_logs)
+            stats['console_calls'] += removed
+            kind = 'script'
+        stats[kind][0] += len(body.encode('utf-8'))
+        stats[kind][1] += len(minified.encode('utf-8'))
+        return f"{opening}{minified}{closing}"
+
+    # Markup is minified between the style and script blocks, which get their own minifiers
+    pieces = re.split(r'(<(?:script|style)\b[^>]*>.*?</(?:script|style)>)', html, flags=re.S)
+    for index, piece in enumerate(pieces):
+        if index % 2:
+            pieces[index] = re.sub(r'(<(?:script|style)\b[^>]*>)(.*?)(</(?:script|style)>)', replace, piece,
+                                   flags=re.S)
+        else:
+            pieces[index] = minify_markup(piece)
+    page = '\n'.join(piece for piece in pieces if piece)
+
+    # The manifest must be defined before the game script reads it; '</' is escaped to stay inside the tag
+    manifest_json = json.dumps(manifest, separators=(',', ':')).replace('</', '<\\/')
+    head = ''.join(preloads) + f"<script>window.ASSET_MANIFEST={manifest_json};</script>"
+    stats['head'][1] = len(head.encode('utf-8'))  # Added by the build: manifest, inlined assets and preloads
+    return page.replace('</head>', head + '</head>', 1), stats
+
+def gzip_size(data):
+    return len(gzip.compress(data, compresslevel=9, mtime=0))
+
+def background_tier(base_dir, manifest):
+    """Logical path of the drawn stage's BACKGROUND_DENSITY tier, from the background index, or None."""
+    index_path = os.path.join(base_dir, BACKGROUND_DIR, BACKGROUND_INDEX)
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        stage = json.load(f)['stages'].get(STAGES[0][0])
+    for tier in stage['tiers'] if stage else []:
+        logical_path = f"{BACKGROUND_DIR}/{tier['file']}"
+        if tier['density'] == BACKGROUND_DENSITY and logical_path in manifest['assets']:
+            return logical_path
+    return None
+
+def main():
+    """Build dist/ and report the byte counts."""
+    parser = argparse.ArgumentParser(description="Build the production site into dist/")
+    parser.add_argument('--output', default=OUTPUT_DIR, help=f"output directory (default: {OUTPUT_DIR})")
+    parser.add_argument('--strip-logs', action='store_true',
+                        help=f"remove console.{{{','.join(STRIPPED_CONSOLE)}}} calls from the script")
+    parser.add_argument('--inline-limit', type=int, default=INLINE_LIMIT_KB,
+                        help=f"inline critical assets up to this many KB as data URIs, 0 for none "
+                             f"(default: {INLINE_LIMIT_KB})")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_root = os.path.abspath(args.output)
+    os.makedirs(output_root, exist_ok=True)
+
+    print("Production Build")
+    print("=" * 50)
+
+    build, manifest = build_assets(base_dir, output_root)
+    removed = build.prune()
+    if removed:
+        print(f"  Pruned {removed} stale hashed file(s)")
+    # Also written out for tools such as load_test.py; the page uses its inlined copy
+    with open(os.path.join(output_root, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    inlined = {}
+    limit = args.inline_limit * 1024
+    for logical_path in CRITICAL_ASSETS:
+        asset = manifest['assets'].get(logical_path)
+        if asset is None:
+            continue
+        if asset['bytes'] > limit:
+            print(f"  Not inlining {logical_path}: {asset['bytes'] / 1024:.1f} KB is over {args.inline_limit} KB")
+            continue
+        inlined[logical_path] = asset['bytes']
+        manifest['assets'][logical_path] = dict(asset, url=data_uri(os.path.join(base_dir, logical_path)))
+
+    preloads = []
+    for logical_path, asset in sorted(manifest['assets'].items()):
+        if (logical_path.startswith(f"{ATLAS_DIR}/") and logical_path.endswith('.json')) or \
+                logical_path in COLLISION_DATA:
+            # fetch() requests are CORS-mode, so the hint needs crossorigin to be reused
+            preloads.append(f'<link rel="preload" href="{asset["url"]}" as="fetch" crossorigin>')
+    background = background_tier(base_dir, manifest)
+    if background:
+        # Loaded with new Image() (no CORS), so no crossorigin here
+        preloads.append(f'<link rel="preload" href="{manifest["assets"][background]["url"]}" as="image">')
+
+    with open(os.path.join(base_dir, PAGE), encoding='utf-8') as f:
+        html = f.read()
+    page, stats = build_page(html, manifest, preloads, args.strip_logs)
+    page_bytes = page.encode('utf-8')
+    with open(os.path.join(output_root, PAGE), 'wb') as f:
+        f.write(page_bytes)
+
+    source_bytes = html.encode('utf-8')
+    print(f"\n  {PAGE}: {len(source_bytes) / 1024:.1f} KB -> {len(page_bytes) / 1024:.1f} KB "
+          f"(gzip {gzip_size(source_bytes) / 1024:.1f} KB -> {gzip_size(page_bytes) / 1024:.1f} KB)")
+    for kind in ('script', 'style', 'head'):
+        before, after = stats[kind]
+        print(f"    {kind}: {before / 1024:.1f} KB -> {after / 1024:.1f} KB")
+    if args.strip_logs:
+        print(f"    console calls stripped: {stats['console_calls']}")
+    print(f"    manifest inlined ({len(manifest['assets'])} assets), {len(preloads)} preload hint(s)")
+    for logical_path, size in inlined.items():
+        print(f"    inlined {logical_path} ({size / 1024:.1f} KB, one request fewer)")
+
+    hashed_bytes = sum(asset['bytes'] for asset in build.assets.values() if 'alias' not in asset)
+    print(f"\n  Hashed assets: {len(build.assets)} files, {hashed_bytes / (1024 * 1024):.1f} MB")
+
+    print("\n" + "=" * 50)
+    print(f"Build written to {output_root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Collision Mask Builder
+Downsamples every normalized pose's alpha into a bit-packed occupancy grid
+(1 bit per CELL_SIZE x CELL_SIZE game pixels, 32-bit words per row) in the
+game's feet-anchored space. Attack poses also get a limb mask covering just
+the striking limb, so a hit can be confirmed with a few word-wise ANDs of
+the attacker's limb against the defender's body.
+"""
+
+import os
+import json
+import math
+import time
+import base64
+import random
+import argparse
+import numpy as np
+from sprite_pipeline import ALPHA_THRESHOLD, alpha_band, alpha_bounds
+from pack_atlas import CHARACTERS, DRAW_SCALE, load_poses
+from extract_boxes import (SPRITE_Y_OFFSET, ATTACK_POSES, AIRBORNE_POSES, pose_boxes,
+                           extract_character)
+
+OUTPUT_FILE = 'collision/masks.json'
+
+CELL_SIZE = 4   # Game pixels per mask cell along each axis
+WORD_BITS = 32  # Matches JavaScript's 32-bit bitwise operators
+
+def cell_indices(start, count, size, scale, cell_size, offset=0.0):
+    """Grid cell of each canvas pixel centre along one axis, in game space."""
+    centres = np.arange(start, start + count) + 0.5
+    return np.floor(((centres - size) * scale + offset) / cell_size).astype(np.int64)
+
+def occupancy_grid(mask, left, top, canvas_size, cell_size=CELL_SIZE, scale=DRAW_SCALE,
+                   y_offset=SPRITE_Y_OFFSET):
+    """
+    Max-pool a cropped boolean mask onto the game-space cell lattice.
+    mask covers canvas pixels from (left, top). Cells are aligned to the
+    fighter's origin, so grids of different poses share one lattice.
+    Returns (grid, cell_x, cell_y) with cell_x/cell_y the first column/row.
+    """
+    canvas_width, canvas_height = canvas_size
+    col_cells = cell_indices(left, mask.shape[1], canvas_width / 2, scale, cell_size)
+    row_cells = cell_indices(top, mask.shape[0], canvas_height, scale, cell_size, y_offset)
+
+    # Cells are wider than a pixel, so indices are sorted and every cell in range is hit
+    col_starts = np.flatnonzero(np.diff(col_cells, prepend=col_cells[0] - 1))
+    row_starts = np.flatnonzero(np.diff(row_cells, prepend=row_cells[0] - 1))
+    grid = np.logical_or.reduceat(mask, col_starts, axis=1)
+    grid = np.logical_or.reduceat(grid, row_starts, axis=0)
+    return grid, int(col_cells[0]), int(row_cells[0])
+
+def pack_rows(grid):
+    """Pack a boolean grid into (rows, words) uint32, bit j of a row = column j."""
+    rows, cols = grid.shape
+    words = max(1, -(-cols // WORD_BITS))
+    padded = np.zeros((rows, words * WORD_BITS), dtype=bool)
+    padded[:, :cols] = grid
+    packed = np.packbits(padded, axis=1, bitorder='little')
+    return np.ascontiguousarray(packed).view('<u4').reshape(rows, words)
+
+def unpack_rows(words, cols):
+    """Inverse of pack_rows."""
+    bits = np.unpackbits(words.astype('<u4').view(np.uint8), axis=1, bitorder='little')
+    return bits[:, :cols].astype(bool)
+
+def make_mask(grid, cell_x, cell_y):
+    """Mask record: packed words plus its anchor on the cell lattice."""
+    return {'cellX': cell_x, 'cellY': cell_y, 'cols': grid.shape[1], 'rows': grid.shape[0],
+            'words': pack_rows(grid)}
+
+def mirror_mask(mask):
+    """The same mask for a fighter facing left (x negated about the origin)."""
+    grid = unpack_rows(mask['words'], mask['cols'])[:, ::-1]
+    return make_mask(grid, -(mask['cellX'] + mask['cols']), mask['cellY'])
+
+def shift_words(words, shift, out_words):
+    """
+    Shift every packed row left by shift bits (negative = right) into
+    out_words words, dropping bits that fall off either end.
+    """
+    word_shift, bit_shift = divmod(shift, WORD_BITS)
+    rows, count = words.shape
+
+    # Zero columns at both ends stand in for out-of-range source words
+    padded = np.zeros((rows, count + 2), dtype=np.uint64)
+    padded[:, 1:-1] = words
+    source = np.arange(out_words) - word_shift + 1
+    high = np.where((source >= 1) & (source <= count), source, 0)
+    low = np.where((source - 1 >= 1) & (source - 1 <= count), source - 1, 0)
+
+    shifted = (padded[:, high] << np.uint64(bit_shift)) & np.uint64(0xFFFFFFFF)
+    if bit_shift:
+        shifted |= padded[:, low] >> np.uint64(WORD_BITS - bit_shift)
+    return shifted
+
+def masks_overlap(a, ax, ay, b, bx, by, cell_size=CELL_SIZE):
+    """
+    Reference overlap test: do mask a at fighter position (ax, ay) and mask b
+    at (bx, by) share any set cell? Positions are snapped to the cell lattice,
+    then b's overlapping rows are shifted into a's columns and ANDed word-wise.
+    Halves round up like Math.round in SpriteManager.masksOverlap (Python's
+    round() would send half-cell offsets to the even cell).
+    """
+    dx = math.floor((bx - ax) / cell_size + 0.5) + b['cellX'] - a['cellX']
+    dy = math.floor((by - ay) / cell_size + 0.5) + b['cellY'] - a['cellY']
+
+    row_start = max(0, dy)
+    row_end = min(a['rows'], dy + b['rows'])
+    if row_start >= row_end or dx >= a['cols'] or dx + b['cols'] <= 0:
+        return False
+
+    a_rows = a['words'][row_start:row_end].astype(np.uint64)
+    b_rows = shift_words(b['words'][row_start - dy:row_end - dy], dx, a_rows.shape[1])
+    return bool((a_rows & b_rows).any())
+
+def boxes_overlap(hitbox, ax, ay, hurtboxes, bx, by):
+    """The game's box test, for comparison."""
+    x, y = ax + hitbox['x'], ay + hitbox['y']
+    for box in hurtboxes:
+        hx, hy = bx + box['x'], by + box['y']
+        if (x < hx + box['width'] and x + hitbox['width'] > hx and
+                y < hy + box['height'] and y + hitbox['height'] > hy):
+            return True
+    return False
+
+def pose_masks(image, pose, cell_size=CELL_SIZE):
+    """Body mask for a pose, plus a limb mask for attack poses (None if not applicable)."""
+    alpha = alpha_band(image)
+    if alpha is None:
+        return None, None
+    bounds = alpha_bounds(alpha)
+    if bounds is None:
+        return None, None
+
+    left, top, right, bottom = bounds
+    body = make_mask(*occupancy_grid(alpha[top:bottom, left:right] > ALPHA_THRESHOLD,
+                                     left, top, image.size, cell_size))
+
+    limb = None
+    if any(keyword in pose for keyword in ATTACK_POSES):
+        boxes = pose_boxes(alpha, grounded=not any(keyword in pose for keyword in AIRBORNE_POSES))
+        if boxes.get('front'):
+            l, t, r, b = boxes['front']
+            limb = make_mask(*occupancy_grid(alpha[t:b, l:r] > ALPHA_THRESHOLD, l, t, image.size, cell_size))
+    return body, limb
+
+def encode_mask(mask):
+    """JSON form of a mask: words as base64 little-endian uint32."""
+    return {
+        'cellX': mask['cellX'],
+        'cellY': mask['cellY'],
+        'cols': mask['cols'],
+        'rows': mask['rows'],
+        'words': mask['words'].shape[1],
+        'data': base64.b64encode(mask['words'].astype('<u4').tobytes()).decode('ascii')
+    }
+
+def benchmark(characters, trials, cell_size=CELL_SIZE):
+    """Time the box test against the mask test on random attacker/defender placements."""
+    pairs = []
+    for attacker_name, attacker in characters.items():
+        for defender_name, defender in characters.items():
+            if attacker_name == defender_name:
+                continue
+            for pose, entry in attacker.items():
+                if entry['limb'] is None or 'hitbox' not in entry['boxes']:
+                    continue
+                for defender_pose, defender_entry in defender.items():
+                    pairs.append((entry, defender_entry))
+    if not pairs:
+        print("  No attack poses to benchmark")
+        return
+
+    rng = random.Random(1)
+    cases = []
+    for _ in range(trials):
+        attacker, defender = rng.choice(pairs)
+        facing = rng.choice((1, -1))
+        # Defender somewhere in front of the attacker, within reach of the limb
+        bx = facing * rng.uniform(0, 200)
+        by = rng.uniform(-60, 60)
+        cases.append((attacker, defender, facing, bx, by))
+
+    def run_boxes():
+        hits = 0
+        for attacker, defender, facing, bx, by in cases:
+            hitbox = attacker['boxes']['hitbox'] if facing == 1 else attacker['mirrored_hitbox']
+            hits += boxes_overlap(hitbox, 0, 0, defender['boxes']['hurtboxes'], bx, by)
+        return hits
+
+    def run_masks():
+        hits = 0
+        for attacker, defender, facing, bx, by in cases:
+            limb = attacker['limb'] if facing == 1 else attacker['mirrored_limb']
+            hits += masks_overlap(limb, 0, 0, defender['body'], bx, by, cell_size)
+        return hits
+
+    start = time.perf_counter()
+    box_hits = run_boxes()
+    box_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mask_hits = run_masks()
+    mask_time = time.perf_counter() - start
+
+    print(f"  {trials} random placements over {len(pairs)} attack/defence pose pairs:")
+    print(f"    Box test:  {box_time / trials * 1e6:8.2f} us/check, {box_hits} hits")
+    print(f"    Mask test: {mask_time / trials * 1e6:8.2f} us/check, {mask_hits} hits "
+          f"({box_hits - mask_hits:+d} vs boxes)")
+    print("    (Python reference; the game runs the same word-wise ANDs on Uint32Arrays)")
+
+def main():
+    """Build collision masks for every character's normalized poses."""
+    parser = argparse.ArgumentParser(description="Build bit-packed collision masks from sprite alpha")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"JSON output (default: {OUTPUT_FILE})")
+    parser.add_argument('--cell', type=int, default=CELL_SIZE,
+                        help=f"game pixels per mask cell (default: {CELL_SIZE})")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="compare the mask overlap test against the box test")
+    parser.add_argument('--trials', type=int, default=20000, help="benchmark placements (default: 20000)")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(base_dir, args.output)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    print("Collision Mask Builder")
+    print("=" * 50)
+
+    data = {
+        'meta': {'version': 1, 'cell': args.cell, 'wordBits': WORD_BITS, 'scale': DRAW_SCALE,
+                 'yOffset': SPRITE_Y_OFFSET, 'facing': 1},
+        'poses': {}
+    }
+    loaded = {}
+    for char_name, input_dir, exclude in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if not os.path.exists(input_path):
+            print(f"\nSkipping {char_name}: Directory {input_path} not found")
+            continue
+
+        print(f"\n  {char_name}:")
+        poses = load_poses(input_path, exclude)
+        boxes = extract_character(poses)
+        data['poses'][char_name] = {}
+        loaded[char_name] = {}
+        for pose, image in poses.items():
+            body, limb = pose_masks(image, pose, args.cell)
+            if body is None:
+                continue
+            entry = {'body': encode_mask(body)}
+            if limb is not None:
+                entry['limb'] = encode_mask(limb)
+            data['poses'][char_name][pose] = entry
+
+            size = body['words'].nbytes + (limb['words'].nbytes if limb else 0)
+            limb_note = f", limb {limb['cols']}x{limb['rows']}" if limb else ""
+            print(f"    {pose}: body {body['cols']}x{body['rows']} cells{limb_note} ({size} bytes)")
+
+            if args.benchmark:
+                pose_boxes_entry = boxes.get(pose, {'hurtboxes': []})
+                hitbox = pose_boxes_entry.get('hitbox')
+                loaded[char_name][pose] = {
+                    'body': body, 'limb': limb, 'boxes': pose_boxes_entry,
+                    'mirrored_limb': mirror_mask(limb) if limb else None,
+                    'mirrored_hitbox': dict(hitbox, x=-hitbox['x'] - hitbox['width']) if hitbox else None
+                }
+
+    with open(output_path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+    if args.benchmark:
+        print("\nBenchmark:")
+        benchmark(loaded, args.trials, args.cell)
+
+    print("\n" + "=" * 50)
+    print(f"Masks saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
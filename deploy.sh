@@ -10,14 +10,21 @@ CURRENT_BRANCH=$(git branch --show-current)
 git checkout main
 git pull origin main
 
+# Build the minified page and content-hashed assets outside the repo so they survive the branch switch
+DIST_BUILD=$(mktemp -d)
+python3 build_dist.py --output "$DIST_BUILD" --strip-logs || exit 1
+
 # Switch to gh-pages
 git checkout gh-pages
 
-# Copy the latest game file
-cp fighter_enhanced.html index.html
+# Copy the built game page; hashed files are added alongside earlier ones,
+# so pages cached before this deploy keep working
+cp -R "$DIST_BUILD"/. .
+rm -rf "$DIST_BUILD"
 
 # Commit and push if there are changes
-if git diff --quiet; then
+git add -f asset-manifest.json hashed
+if git diff --quiet && git diff --cached --quiet; then
     echo "No changes to deploy"
 else
     git add index.html
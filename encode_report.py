@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Encoding Size Report
+Re-encodes sprites, atlases and the background with every encode profile and
+reports how each variant compares to the file on disk, so we can pick the
+profile with the best size for mobile downloads.
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+from PIL import Image
+import numpy as np
+from sprite_pipeline import ENCODE_PROFILES, encode_image
+
+# What the game downloads
+DEFAULT_TARGETS = [
+    'elon/Elon1_normalized_v3',
+    'trump1_normalized_v3',
+    'atlas',
+    'ChatGPT Image Jul 31, 2025, 08_46_53 PM.png'
+]
+
+REPORT_FILE = 'encode_report.json'
+
+def list_images(target):
+    """PNG files for a file or directory target, sorted."""
+    if os.path.isdir(target):
+        return [os.path.join(target, f) for f in sorted(os.listdir(target)) if f.lower().endswith('.png')]
+    return [target] if target.lower().endswith('.png') else []
+
+def max_alpha_error(original, encoded):
+    """Largest per-pixel alpha difference after a round trip (0 = alpha kept exactly)."""
+    original_alpha = np.asarray(original.getchannel('A'), dtype=np.int16)
+    encoded_alpha = np.asarray(encoded.convert('RGBA').getchannel('A'), dtype=np.int16)
+    return int(np.abs(original_alpha - encoded_alpha).max())
+
+def measure(path, profiles):
+    """
+    Encode one image with each profile in memory.
+    Returns {profile: {'bytes', 'ms', 'max_alpha_error'}}.
+    """
+    image = Image.open(path)
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    image.load()
+
+    results = {}
+    for name in profiles:
+        buffer = io.BytesIO()
+        start = time.perf_counter()
+        encode_image(image, buffer, name)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        buffer.seek(0)
+        results[name] = {
+            'bytes': buffer.getbuffer().nbytes,
+            'ms': round(elapsed, 1),
+            'max_alpha_error': max_alpha_error(image, Image.open(buffer))
+        }
+    return results
+
+def main():
+    """Measure every encode profile against the current files."""
+    parser = argparse.ArgumentParser(description="Compare sprite encode profiles against the files on disk")
+    parser.add_argument('targets', nargs='*', help="files or directories to measure (default: game assets)")
+    parser.add_argument('--profiles', default=','.join(ENCODE_PROFILES),
+                        help=f"comma-separated encode profiles (default: {','.join(ENCODE_PROFILES)})")
+    parser.add_argument('--output', default=REPORT_FILE, help=f"JSON report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    profiles = args.profiles.split(',')
+    unknown = [name for name in profiles if name not in ENCODE_PROFILES]
+    if unknown:
+        parser.error(f"unknown encode profile(s): {', '.join(unknown)}")
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    targets = args.targets or [os.path.join(base_dir, target) for target in DEFAULT_TARGETS]
+
+    print("Encoding Size Report")
+    print("=" * 50)
+
+    report = {'profiles': profiles, 'targets': {}}
+    grand_source = 0
+    grand_totals = {name: 0 for name in profiles}
+
+    for target in targets:
+        files = list_images(target)
+        if not files:
+            print(f"\nSkipping {target}: no PNG files found")
+            continue
+
+        label = os.path.relpath(target, base_dir)
+        print(f"\n  {label} ({len(files)} file(s)):")
+
+        source_total = 0
+        totals = {name: 0 for name in profiles}
+        entries = {}
+        for path in files:
+            source_bytes = os.path.getsize(path)
+            results = measure(path, profiles)
+            source_total += source_bytes
+            for name, result in results.items():
+                totals[name] += result['bytes']
+            entries[os.path.basename(path)] = {'source_bytes': source_bytes, 'variants': results}
+
+        for name in profiles:
+            alpha_error = max(entry['variants'][name]['max_alpha_error'] for entry in entries.values())
+            note = f"  (alpha error up to {alpha_error})" if alpha_error else ""
+            print(f"    {name:<14} {source_total / 1024:>8.0f} KB -> {totals[name] / 1024:>8.0f} KB "
+                  f"({100 * totals[name] / max(source_total, 1):>3.0f}%){note}")
+
+        report['targets'][label] = {'source_bytes': source_total, 'totals': totals, 'files': entries}
+        grand_source += source_total
+        for name in profiles:
+            grand_totals[name] += totals[name]
+
+    report['source_bytes'] = grand_source
+    report['totals'] = grand_totals
+
+    print("\n  Total:")
+    for name in profiles:
+        print(f"    {name:<14} {grand_source / 1024:>8.0f} KB -> {grand_totals[name] / 1024:>8.0f} KB "
+              f"({100 * grand_totals[name] / max(grand_source, 1):>3.0f}%)")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Hurtbox / Hitbox Extractor
+Analyses the alpha mask of every normalized pose and emits a few tight boxes
+per pose (head, torso, extended limbs) in the game's feet-anchored coordinate
+space, so Fighter.updateHitboxes can use precomputed boxes for the pose on screen.
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+from sprite_pipeline import ALPHA_THRESHOLD, alpha_band, alpha_bounds
+from pack_atlas import CHARACTERS, DRAW_SCALE, load_poses
+
+OUTPUT_FILE = 'collision/boxes.json'
+
+SPRITE_Y_OFFSET = 54  # index.html SPRITE_Y_OFFSET - keep in sync
+
+TORSO_DENSITY = 0.5     # Torso columns hold at least this share of the densest column's pixels
+HEAD_RATIO = 0.2        # Top share of the torso span treated as the head
+HEAD_MARGIN_RATIO = 0.25  # Head may stick out past the torso by this share of the torso width
+MIN_LIMB_RATIO = 0.08   # Limbs narrower than this share of body height are folded into the torso
+LIMB_REACH_RATIO = 0.5  # Rows reaching at least this share of the furthest reach belong to the limb
+GROUND_RATIO = 0.25     # Bottom share of grounded poses is planted feet, never the extended limb
+
+# Airborne poses, whose lowest limb can be the attack
+AIRBORNE_POSES = ('jump', 'thrown')
+
+# Poses whose forward limb is an attack hitbox (sprites face right)
+ATTACK_POSES = ('punch', 'kick', 'powermove')
+
+def dense_span(counts, threshold):
+    """The contiguous run of counts >= threshold that contains the maximum."""
+    peak = int(counts.argmax())
+    sparse = np.flatnonzero(counts < threshold)
+    left = sparse[sparse < peak]
+    right = sparse[sparse > peak]
+    start = int(left[-1]) + 1 if len(left) else 0
+    end = int(right[0]) if len(right) else len(counts)
+    return start, end
+
+def mask_box(mask, x_offset=0, y_offset=0):
+    """Bounding box (left, top, right, bottom) of a boolean mask, or None if empty."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return (x_offset + int(cols[0]), y_offset + int(rows[0]),
+            x_offset + int(cols[-1]) + 1, y_offset + int(rows[-1]) + 1)
+
+def limb_box(mask, min_width):
+    """
+    The extended limb in a mask of everything past the torso, reaching right:
+    the contiguous band of rows around the furthest-reaching row that reach at
+    least LIMB_REACH_RATIO as far. Returns a box or None.
+    """
+    if mask.shape[1] == 0:
+        return None
+    has_content = mask.any(axis=1)
+    reach = np.where(has_content, mask.shape[1] - mask[:, ::-1].argmax(axis=1), 0)
+    if reach.max() < min_width:
+        return None
+
+    start, end = dense_span(reach, reach.max() * LIMB_REACH_RATIO)
+    box = mask_box(mask[start:end])
+    return (box[0], box[1] + start, box[2], box[3] + start)
+
+def offset_box(box, x, y):
+    """Shift a box, keeping None."""
+    return None if box is None else (box[0] + x, box[1] + y, box[2] + x, box[3] + y)
+
+def pose_boxes(alpha, threshold=ALPHA_THRESHOLD, grounded=True):
+    """
+    Split a pose's silhouette into canvas-space boxes.
+    Returns {'head', 'torso', 'front', 'back'} -> (left, top, right, bottom) or
+    None; front/back are limbs reaching past the torso columns. On grounded
+    poses a wide stance isn't mistaken for a limb.
+    """
+    bounds = alpha_bounds(alpha, threshold)
+    if bounds is None:
+        return {}
+    left, top, right, bottom = bounds
+    mask = alpha[top:bottom, left:right] > threshold
+
+    # Torso: the dense band of columns around the densest column
+    counts = mask.sum(axis=0)
+    torso_l, torso_r = dense_span(counts, counts.max() * TORSO_DENSITY)
+    torso_rows = np.flatnonzero(mask[:, torso_l:torso_r].any(axis=1))
+    span_top, span_bottom = int(torso_rows[0]), int(torso_rows[-1]) + 1
+
+    # Head: top of the torso span, allowed to lean a little past the torso columns
+    head_bottom = span_top + max(1, int((span_bottom - span_top) * HEAD_RATIO))
+    margin = int((torso_r - torso_l) * HEAD_MARGIN_RATIO)
+    head_l = max(0, torso_l - margin)
+    head = mask_box(mask[span_top:head_bottom, head_l:torso_r + margin], left + head_l, top + span_top)
+
+    torso = mask_box(mask[head_bottom:span_bottom, torso_l:torso_r], left + torso_l, top + head_bottom)
+
+    # Limbs: the furthest reach past the torso columns on each side
+    min_limb = (bottom - top) * MIN_LIMB_RATIO
+    limb_rows = mask[:len(mask) - int(len(mask) * GROUND_RATIO)] if grounded else mask
+    front = offset_box(limb_box(limb_rows[:, torso_r:], min_limb), left + torso_r, top)
+    back = limb_box(limb_rows[:, :torso_l][:, ::-1], min_limb)
+    if back is not None:
+        # Mirrored search; flip the columns back
+        back = (left + torso_l - back[2], top + back[1], left + torso_l - back[0], top + back[3])
+
+    return {'head': head, 'torso': torso, 'front': front, 'back': back}
+
+def to_game_box(box, canvas_size, part, scale=DRAW_SCALE, y_offset=SPRITE_Y_OFFSET):
+    """
+    Convert a canvas-space box to the game's space: origin at the fighter's
+    (x, y), facing right, scaled like SpriteManager.drawSprite draws the canvas.
+    """
+    canvas_width, canvas_height = canvas_size
+    left, top, right, bottom = box
+    return {
+        'x': round((left - canvas_width / 2) * scale, 1),
+        'y': round((top - canvas_height) * scale + y_offset, 1),
+        'width': round((right - left) * scale, 1),
+        'height': round((bottom - top) * scale, 1),
+        'part': part
+    }
+
+def extract_character(poses, scale=DRAW_SCALE, y_offset=SPRITE_Y_OFFSET):
+    """Hurtboxes (and attack hitboxes) in game space for every pose of one character."""
+    result = {}
+    for pose, image in poses.items():
+        alpha = alpha_band(image)
+        if alpha is None:
+            continue
+        boxes = pose_boxes(alpha, grounded=not any(keyword in pose for keyword in AIRBORNE_POSES))
+        if not boxes:
+            continue
+
+        hurtboxes = [to_game_box(boxes[part], image.size, part, scale, y_offset)
+                     for part in ('head', 'torso', 'front', 'back') if boxes[part]]
+        entry = {'hurtboxes': hurtboxes}
+        if boxes['front'] and any(keyword in pose for keyword in ATTACK_POSES):
+            entry['hitbox'] = to_game_box(boxes['front'], image.size, 'front', scale, y_offset)
+        result[pose] = entry
+    return result
+
+def main():
+    """Extract boxes for every character's normalized poses."""
+    parser = argparse.ArgumentParser(description="Extract hurtboxes and hitboxes from sprite alpha masks")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"JSON output (default: {OUTPUT_FILE})")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(base_dir, args.output)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    print("Hurtbox / Hitbox Extractor")
+    print("=" * 50)
+
+    data = {
+        'meta': {'version': 1, 'scale': DRAW_SCALE, 'yOffset': SPRITE_Y_OFFSET, 'facing': 1},
+        'poses': {}
+    }
+    for char_name, input_dir, exclude in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if not os.path.exists(input_path):
+            print(f"\nSkipping {char_name}: Directory {input_path} not found")
+            continue
+
+        print(f"\n  {char_name}:")
+        poses = extract_character(load_poses(input_path, exclude))
+        data['poses'][char_name] = poses
+        for pose, entry in poses.items():
+            parts = ', '.join(box['part'] for box in entry['hurtboxes'])
+            hit = f", hitbox {entry['hitbox']['width']:.0f}x{entry['hitbox']['height']:.0f}" if 'hitbox' in entry else ""
+            print(f"    {pose}: {parts}{hit}")
+
+    with open(output_path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Boxes saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Content-Hashed Asset Build
+Copies everything the game loads to hashed/ under content-hashed filenames
+(standing.3f9a1c0d.png) and writes asset-manifest.json mapping each logical
+path and pose to its hashed URL and byte size. Hashed files never change, so
+they can be cached as immutable; a rebuilt sprite simply gets a new name.
+Byte-identical files are stored once: later copies point at the first one's
+URL and are marked with an alias entry in the manifest.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from sprite_pipeline import pose_files
+from build_backgrounds import INDEX_FILE as BACKGROUND_INDEX
+
+HASHED_DIR = 'hashed'
+MANIFEST_FILE = 'asset-manifest.json'
+HASH_LENGTH = 8  # Hex digits of SHA-256 kept in filenames (simple_server.py HASHED_NAME - keep in sync)
+
+# Individual pose sprites, keyed by character (SpriteManager basePath fallbacks)
+SPRITE_DIRS = [
+    ('elon', 'elon/Elon1_normalized_v3'),
+    ('trump', 'trump1_normalized_v3')
+]
+
+ATLAS_DIR = 'atlas'
+
+BACKGROUND_DIR = 'backgrounds'  # Pre-scaled stage backgrounds written by build_backgrounds.py
+BACKGROUND_EXTENSIONS = ('.jpg', '.png', '.webp')
+
+# Other files index.html loads by path
+STATIC_ASSETS = [
+    'ChatGPT Image Jul 31, 2025, 08_46_53 PM.png',
+    'trump1/cash.png',
+    'collision/boxes.json',
+    'collision/masks.json'
+]
+
+IMAGE_EXTENSIONS = ('.png', '.webp')
+SPRITE_METADATA = 'metadata.json'  # Written next to the sprites by normalize_sprites_v3.py
+
+def hashed_name(filename, data):
+    """filename with a content hash before the extension."""
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+class AssetBuild:
+    """
+    Writes hashed copies under output_root/hashed and records them in the manifest.
+    Logical paths are relative to the repo, with forward slashes as in index.html.
+    """
+
+    def __init__(self, base_dir, output_root):
+        self.base_dir = base_dir
+        self.output_root = output_root
+        self.assets = {}
+        self.written = set()
+        self.by_digest = {}  # (directory, SHA-256) -> first logical path with that content
+
+    def emit(self, logical_path, data):
+        """
+        Write data under its hashed name (if not already there); returns the hashed URL.
+        Data already emitted under another path in the same directory reuses that
+        URL (same directory, so atlas JSON can keep referring to pages by basename).
+        """
+        directory, filename = os.path.split(logical_path)
+        canonical = self.by_digest.setdefault((directory, hashlib.sha256(data).hexdigest()), logical_path)
+        if canonical != logical_path:
+            url = self.assets[canonical]['url']
+            self.assets[logical_path] = {'url': url, 'bytes': len(data), 'alias': canonical}
+            return url
+
+        url = '/'.join(part for part in (HASHED_DIR, directory, hashed_name(filename, data)) if part)
+        path = os.path.join(self.output_root, *url.split('/'))
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+        self.written.add(os.path.normpath(path))
+        self.assets[logical_path] = {'url': url, 'bytes': len(data)}
+        return url
+
+    def add_file(self, logical_path):
+        """Hash a file as-is; returns its hashed URL."""
+        if logical_path not in self.assets:
+            with open(os.path.join(self.base_dir, logical_path), 'rb') as f:
+                self.emit(logical_path, f.read())
+        return self.assets[logical_path]['url']
+
+    def add_atlas(self, logical_path):
+        """
+        Hash an atlas JSON after pointing its pages and tier atlases at their
+        hashed names, so a changed page also renames every JSON that refers to it.
+        """
+        if logical_path in self.assets:
+            return self.assets[logical_path]['url']
+
+        with open(os.path.join(self.base_dir, logical_path)) as f:
+            atlas = json.load(f)
+        directory = os.path.dirname(logical_path)
+        meta = atlas['meta']
+
+        # References stay relative to the JSON, which lands in the same hashed directory
+        # A tiered atlas's JSON lists only its tiers, without pages of its own
+        if 'images' in meta:
+            meta['images'] = [os.path.basename(self.add_file(f"{directory}/{name}")) for name in meta['images']]
+        for tier in meta.get('tiers', []):
+            tier['atlas'] = os.path.basename(self.add_atlas(f"{directory}/{tier['atlas']}"))
+
+        return self.emit(logical_path, json.dumps(atlas, separators=(',', ':')).encode('utf-8'))
+
+    def prune(self):
+        """Delete hashed files left over from earlier builds; returns how many."""
+        removed = 0
+        hashed_root = os.path.join(self.output_root, HASHED_DIR)
+        for root, _, files in os.walk(hashed_root):
+            for filename in files:
+                path = os.path.normpath(os.path.join(root, filename))
+                if path not in self.written:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+def build_assets(base_dir, output_root):
+    """Hash every game asset into output_root; returns (build, manifest data)."""
+    build = AssetBuild(base_dir, output_root)
+    poses = {}
+
+    for char_name, sprite_dir in SPRITE_DIRS:
+        input_path = os.path.join(base_dir, sprite_dir)
+        if not os.path.exists(input_path):
+            print(f"\nSkipping {char_name}: Directory {input_path} not found")
+            continue
+        filenames = sorted(f for f in os.listdir(input_path) if f.lower().endswith(IMAGE_EXTENSIONS))
+        for filename in filenames:
+            build.add_file(f"{sprite_dir}/{filename}")
+        # SpriteManager resolves each pose's file (and so its encoding) from the metadata
+        if os.path.exists(os.path.join(input_path, SPRITE_METADATA)):
+            build.add_file(f"{sprite_dir}/{SPRITE_METADATA}")
+        poses[char_name] = {name: build.assets[f"{sprite_dir}/{filename}"]
+                            for name, filename in pose_files(input_path, SPRITE_METADATA).items()}
+        print(f"  {char_name}: {len(filenames)} sprites")
+
+    atlas_path = os.path.join(base_dir, ATLAS_DIR)
+    if os.path.exists(atlas_path):
+        atlases = sorted(f for f in os.listdir(atlas_path) if f.endswith('.json'))
+        for filename in atlases:
+            build.add_atlas(f"{ATLAS_DIR}/{filename}")
+        print(f"  {ATLAS_DIR}: {len(atlases)} atlas JSON file(s)")
+
+    background_path = os.path.join(base_dir, BACKGROUND_DIR)
+    if os.path.exists(background_path):
+        backgrounds = sorted(f for f in os.listdir(background_path) if f.lower().endswith(BACKGROUND_EXTENSIONS))
+        for filename in backgrounds:
+            build.add_file(f"{BACKGROUND_DIR}/{filename}")
+        # The page reads its tier list from the index
+        if os.path.exists(os.path.join(background_path, BACKGROUND_INDEX)):
+            build.add_file(f"{BACKGROUND_DIR}/{BACKGROUND_INDEX}")
+        print(f"  {BACKGROUND_DIR}: {len(backgrounds)} background tier(s)")
+
+    for logical_path in STATIC_ASSETS:
+        if os.path.exists(os.path.join(base_dir, logical_path)):
+            build.add_file(logical_path)
+        else:
+            print(f"  Skipping {logical_path}: not found")
+
+    return build, {'version': 1, 'hashLength': HASH_LENGTH, 'assets': build.assets, 'poses': poses}
+
+def main():
+    """Hash every game asset and write the manifest."""
+    parser = argparse.ArgumentParser(description="Write content-hashed copies of the game's assets and a manifest")
+    parser.add_argument('--output', default=None,
+                        help=f"directory to write {HASHED_DIR}/ and {MANIFEST_FILE} into (default: repo root)")
+    parser.add_argument('--keep-stale', action='store_true',
+                        help=f"keep hashed files from earlier builds instead of pruning {HASHED_DIR}/")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_root = os.path.abspath(args.output or base_dir)
+
+    print("Content-Hashed Asset Build")
+    print("=" * 50)
+
+    build, manifest = build_assets(base_dir, output_root)
+    with open(os.path.join(output_root, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    unique = [asset for asset in build.assets.values() if 'alias' not in asset]
+    total = sum(asset['bytes'] for asset in unique)
+    print(f"\n  {len(build.assets)} assets ({len(build.assets) - len(unique)} duplicate), "
+          f"{total / (1024 * 1024):.1f} MB unique")
+    if not args.keep_stale:
+        removed = build.prune()
+        if removed:
+            print(f"  Pruned {removed} stale hashed file(s)")
+
+    print("\n" + "=" * 50)
+    print(f"Manifest saved to {os.path.join(output_root, MANIFEST_FILE)}")
+
+if __name__ == "__main__":
+    main()
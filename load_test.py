@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Asset Server Load Test
+Replays the game's cold-load request set (index.html, the asset manifest,
+background tier, cash sprite, atlases or individual sprites and collision data)
+for N simultaneous simulated clients against a running simple_server.py.
+Reports throughput, cold-load times, per-asset latency percentiles and
+errors at each client count, so server changes can be measured.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+import http.client
+import urllib.parse
+from hash_assets import MANIFEST_FILE, STATIC_ASSETS, BACKGROUND_DIR
+from build_backgrounds import STAGES, INDEX_FILE as BACKGROUND_INDEX
+from simple_server import PORT, percentiles
+
+DEFAULT_CLIENTS = '1,4,8,16'
+CONNECTIONS_PER_CLIENT = 6  # Browsers open up to six connections per host
+DEFAULT_DENSITY = 1.0       # Device pixels per game unit, for the atlas tier the page would pick
+REQUEST_TIMEOUT = 30
+ACCEPT_ENCODING = 'gzip, deflate, br'
+PAGE = 'index.html'
+
+REPORT_FILE = 'load_report.json'
+
+def sprite_mappings(html):
+    """
+    {character: {'basePath', 'atlas', 'files'}} parsed from SpriteManager's
+    spriteMappings in index.html; files are the distinct sprite filenames.
+    """
+    block = re.search(r'this\.spriteMappings = \{(.*?)\n\s*\};', html, re.S)
+    if block is None:
+        return {}
+    mappings = {}
+    pattern = r"'(\w+)':\s*\{\s*basePath:\s*'([^']*)',(.*?)sprites:\s*\{(.*?)\}"
+    for name, base_path, options, sprites in re.findall(pattern, block.group(1), re.S):
+        atlas = re.search(r"atlas:\s*'([^']*)'", options)
+        mappings[name] = {
+            'basePath': base_path,
+            'atlas': atlas.group(1) if atlas else None,
+            'files': list(dict.fromkeys(re.findall(r"'[^']+':\s*'([^']+)'", sprites)))
+        }
+    return mappings
+
+def pick_tier(tiers, density):
+    """Smallest tier covering density, else the sharpest (pickTier() in index.html)."""
+    ordered = sorted(tiers, key=lambda tier: tier['density'])
+    return next((tier for tier in ordered if tier['density'] >= density), ordered[-1])
+
+def atlas_paths(base_dir, atlas_path, density):
+    """Logical paths the page fetches for one atlas: its JSON, the chosen tier's JSON and the pages."""
+    directory = os.path.dirname(atlas_path)
+    with open(os.path.join(base_dir, atlas_path)) as f:
+        meta = json.load(f)['meta']
+    paths = [atlas_path]
+    if meta.get('tiers'):
+        tier_path = f"{directory}/{pick_tier(meta['tiers'], density)['atlas']}"
+        return paths + atlas_paths(base_dir, tier_path, density)
+    return paths + [f"{directory}/{name}" for name in meta['images']]
+
+def background_path(base_dir, density):
+    """
+    Logical path of the background the page draws: the pre-scaled tier for
+    density when build_backgrounds.py has run, else the source image.
+    """
+    stage_name, source = STAGES[0]
+    index_path = os.path.join(base_dir, BACKGROUND_DIR, BACKGROUND_INDEX)
+    if not os.path.exists(index_path):
+        return source
+    with open(index_path) as f:
+        stage = json.load(f)['stages'].get(stage_name)
+    if not stage or not stage['tiers']:
+        return source
+    return f"{BACKGROUND_DIR}/{pick_tier(stage['tiers'], density)['file']}"
+
+def request_set(base_dir, mode, density):
+    """
+    (logical path, URL path) for everything one cold page load requests, in
+    page order and without repeats. URLs go through the asset manifest like
+    assetUrl() does when one has been built.
+    """
+    with open(os.path.join(base_dir, PAGE)) as f:
+        html = f.read()
+
+    manifest_path = os.path.join(base_dir, MANIFEST_FILE)
+    assets = {}
+    paths = [PAGE]
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            assets = json.load(f)['assets']
+        paths.append(MANIFEST_FILE)
+
+    # The page draws a background tier; the source image is only its fallback
+    background = background_path(base_dir, density)
+    statics = [background if path == STAGES[0][1] else path for path in STATIC_ASSETS]
+    paths += [path for path in statics if os.path.exists(os.path.join(base_dir, path))]
+    for mapping in sprite_mappings(html).values():
+        atlas = mapping['atlas']
+        if mode == 'atlas' and atlas and os.path.exists(os.path.join(base_dir, atlas)):
+            paths += atlas_paths(base_dir, atlas, density)
+        else:
+            paths += [mapping['basePath'] + filename for filename in mapping['files']]
+
+    requests = []
+    for path in dict.fromkeys(paths):
+        url = assets[path]['url'] if path in assets else path
+        requests.append((path, '/' + urllib.parse.quote(url)))
+    return requests
+
+def fetch(connection, url):
+    """GET url on a keep-alive connection. Returns (status, bytes, ttfb_ms, total_ms)."""
+    start = time.perf_counter()
+    connection.request('GET', url, headers={'Accept-Encoding': ACCEPT_ENCODING})
+    response = connection.getresponse()
+    first_byte = time.perf_counter()
+    body = response.read()
+    done = time.perf_counter()
+    return response.status, len(body), (first_byte - start) * 1000, (done - start) * 1000
+
+def cold_load(host, port, requests, connections):
+    """
+    One simulated cold page load: the page first, then every asset spread
+    over `connections` fresh keep-alive connections (the page's one included).
+    Returns (load_ms, samples) with one (path, status or None, bytes, ttfb_ms, total_ms, error) per request.
+    """
+    samples = []
+    lock = threading.Lock()
+    pending = list(requests[1:])
+
+    def get(connection, path, url):
+        try:
+            sample = (path,) + fetch(connection, url) + (None,)
+        except (OSError, http.client.HTTPException) as e:
+            sample = (path, None, 0, 0.0, 0.0, type(e).__name__)
+            connection.close()  # Reconnects on the next request
+        with lock:
+            samples.append(sample)
+
+    def worker(connection):
+        try:
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    path, url = pending.pop(0)
+                get(connection, path, url)
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    page_connection = http.client.HTTPConnection(host, port, timeout=REQUEST_TIMEOUT)
+    get(page_connection, *requests[0])
+    others = [http.client.HTTPConnection(host, port, timeout=REQUEST_TIMEOUT) for _ in range(connections - 1)]
+    threads = [threading.Thread(target=worker, args=(connection,)) for connection in [page_connection] + others]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) * 1000, samples
+
+def run_level(host, port, requests, clients, connections, rounds):
+    """Run `clients` simulated clients at once, each doing `rounds` cold loads back to back."""
+    loads = []
+    samples = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client():
+        barrier.wait()
+        for _ in range(rounds):
+            load_ms, load_samples = cold_load(host, port, requests, connections)
+            with lock:
+                loads.append(load_ms)
+                samples.extend(load_samples)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    errors = {}
+    per_asset = {}
+    for path, status, _, ttfb_ms, total_ms, error in samples:
+        asset = per_asset.setdefault(path, {'ttfb': [], 'total': [], 'errors': 0})
+        if error is not None or status >= 400:
+            reason = error or f"HTTP {status}"
+            errors[reason] = errors.get(reason, 0) + 1
+            asset['errors'] += 1
+            continue
+        asset['ttfb'].append(ttfb_ms)
+        asset['total'].append(total_ms)
+
+    total_bytes = sum(sample[2] for sample in samples)
+    return {
+        'clients': clients,
+        'loads': len(loads),
+        'requests': len(samples),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'requests_per_s': round(len(samples) / elapsed, 1),
+        'mb_per_s': round(total_bytes / 1024 / 1024 / elapsed, 1),
+        'load_ms': dict(percentiles(loads), max=round(max(loads), 1)),
+        'assets': {path: {'requests': len(asset['ttfb']) + asset['errors'], 'errors': asset['errors'],
+                          'ttfb_ms': percentiles(asset['ttfb']), 'total_ms': percentiles(asset['total'])}
+                   for path, asset in per_asset.items()}
+    }
+
+def main():
+    """Load-test a running asset server at increasing client counts."""
+    parser = argparse.ArgumentParser(description="Replay the game's cold-load requests against a running server")
+    parser.add_argument('--url', default=f"http://localhost:{PORT}",
+                        help=f"server to test (default: http://localhost:{PORT})")
+    parser.add_argument('--clients', default=DEFAULT_CLIENTS,
+                        help=f"comma-separated simultaneous client counts to run in turn (default: {DEFAULT_CLIENTS})")
+    parser.add_argument('--rounds', type=int, default=3, help="cold loads per client at each level (default: 3)")
+    parser.add_argument('--connections', type=int, default=CONNECTIONS_PER_CLIENT,
+                        help=f"parallel connections per client (default: {CONNECTIONS_PER_CLIENT})")
+    parser.add_argument('--mode', choices=['atlas', 'sprites'], default='atlas',
+                        help="load the packed atlases like the game, or every individual sprite (default: atlas)")
+    parser.add_argument('--density', type=float, default=DEFAULT_DENSITY,
+                        help=f"screen density used to pick the atlas tier (default: {DEFAULT_DENSITY:g})")
+    parser.add_argument('--directory', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="directory the server is serving, read for the request set (default: this repo)")
+    parser.add_argument('--output', default=REPORT_FILE, help=f"JSON report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    try:
+        levels = [int(value) for value in args.clients.split(',')]
+    except ValueError:
+        parser.error("--clients must look like 1,4,8,16")
+    target = urllib.parse.urlsplit(args.url)
+    host, port = target.hostname or 'localhost', target.port or 80
+
+    requests = request_set(args.directory, args.mode, args.density)
+
+    print("Asset Server Load Test")
+    print("=" * 50)
+    print(f"Target: {args.url}")
+    print(f"Request set: {len(requests)} files ({args.mode}), {args.connections} connections per client")
+
+    try:
+        fetch(http.client.HTTPConnection(host, port, timeout=REQUEST_TIMEOUT), requests[0][1])
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Error: {args.url} is not answering ({e}). Start simple_server.py first.")
+        sys.exit(1)
+
+    report = {'url': args.url, 'mode': args.mode, 'connections': args.connections, 'rounds': args.rounds,
+              'requests': [path for path, _ in requests], 'levels': []}
+
+    print(f"\n  {'clients':>7}{'req/s':>9}{'MB/s':>8}{'load p50':>10}{'p95':>8}{'max':>8}{'vs 1st':>8}  errors")
+    for clients in levels:
+        result = run_level(host, port, requests, clients, args.connections, args.rounds)
+        report['levels'].append(result)
+        baseline = report['levels'][0]['load_ms']['p50']
+        load = result['load_ms']
+        errors = ', '.join(f"{reason} x{count}" for reason, count in sorted(result['errors'].items())) or '-'
+        print(f"  {clients:>7}{result['requests_per_s']:>9.1f}{result['mb_per_s']:>8.1f}"
+              f"{load['p50']:>10.1f}{load['p95']:>8.1f}{load['max']:>8.1f}{load['p50'] / baseline:>7.1f}x  {errors}")
+
+    busiest = report['levels'][-1]
+    print(f"\n  Per asset at {busiest['clients']} client(s) (total ms):")
+    print(f"    {'p50':>8}{'p95':>8}{'p99':>8}{'ttfb p95':>10}  errors  path")
+    for path, asset in sorted(busiest['assets'].items(), key=lambda item: -(item[1]['total_ms']['p95'] or 0)):
+        total = asset['total_ms']
+        if total['p50'] is None:
+            print(f"    {'-':>8}{'-':>8}{'-':>8}{'-':>10}  {asset['errors']:>6}  {path}")
+            continue
+        print(f"    {total['p50']:>8.1f}{total['p95']:>8.1f}{total['p99']:>8.1f}{asset['ttfb_ms']['p95']:>10.1f}"
+              f"  {asset['errors']:>6}  {path}")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Texture Atlas Packer
+Trims the transparent padding from every normalized pose and packs the poses
+into one atlas image per character (or one shared atlas), plus a frame JSON
+that SpriteManager.drawSprite can use directly. With resolution tiers
+(multiples of the in-game draw scale, picked by the game at startup based on
+devicePixelRatio) only the pre-scaled tiers are packed, and <atlas>.json just
+lists them; the full-size pages are packed with --tiers "". With --delta, later frames of animation
+sequences are packed as patches over their key frame (see sprite_delta.py).
+"""
+
+import os
+import re
+import json
+import argparse
+from PIL import Image
+from sprite_pipeline import (ENCODE_PROFILES, DEFAULT_ENCODE, RESAMPLE_PROFILES, DEFAULT_RESAMPLE, encode_image,
+                             pose_files, resize_sprite)
+from sprite_dedupe import alias_map
+from sprite_delta import MIN_SAVINGS, encode_delta, plan_deltas, print_report
+
+# Characters to pack: (name, normalized input dir, pose names to leave out)
+CHARACTERS = [
+    ('elon', 'elon/Elon1_normalized_v3', ['throw_backup']),
+    ('trump', 'trump1_normalized_v3', ['cash'])  # cash.png is loaded unnormalized from trump1/
+]
+
+OUTPUT_DIR = 'atlas'
+PADDING = 2           # Transparent gap between frames so filtering doesn't bleed
+MAX_ATLAS_SIZE = 4096  # Safe texture size limit for mobile GPUs
+
+DRAW_SCALE = 0.41     # SpriteManager.spriteConfig.scale - keep in sync with index.html
+# Device pixels per canvas pixel each tier is built for. The canvas backing
+# store is BASE_WIDTH wide, so pickTier() never asks for more than 1x.
+DEFAULT_TIERS = [1]
+
+def trim_sprite(image):
+    """
+    Crop a sprite to its non-transparent pixels.
+    Returns (trimmed image, trim_x, trim_y). Any pixel with alpha > 0 is kept
+    so the atlas frame is pixel-identical to the source canvas.
+    """
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+
+    bounds = image.getchannel('A').getbbox()
+    if bounds is None:
+        # Fully transparent - keep a 1x1 frame so the pose still exists
+        return image.crop((0, 0, 1, 1)), 0, 0
+
+    return image.crop(bounds), bounds[0], bounds[1]
+
+def shelf_pack(sizes, order, page_width, max_size, padding):
+    """Shelf-pack the frames in order into pages page_width wide."""
+    placements = {}
+    pages = []
+    page = 0
+    x = y = shelf_height = used_width = 0
+
+    for name in order:
+        w, h = sizes[name]
+
+        # Start a new shelf when this frame doesn't fit on the current one
+        if x + w > page_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+
+        # Start a new page when the shelf doesn't fit vertically
+        if y + h > max_size:
+            pages.append((used_width, y - padding))
+            page += 1
+            x = y = shelf_height = used_width = 0
+
+        placements[name] = (page, x, y)
+        x += w + padding
+        used_width = max(used_width, x - padding)
+        shelf_height = max(shelf_height, h)
+
+    pages.append((used_width, y + shelf_height))
+    return placements, pages
+
+def pack_frames(sizes, max_size=MAX_ATLAS_SIZE, padding=PADDING):
+    """
+    Shelf-pack rectangles, tallest first, trying a range of page widths and
+    keeping the layout with the fewest pages and least total area.
+    sizes is a dict of name -> (width, height).
+    Returns (placements, pages) where placements maps name -> (page, x, y)
+    and pages is a list of (width, height) for each atlas page.
+    """
+    if not sizes:
+        return {}, []
+
+    for name, (w, h) in sizes.items():
+        if w > max_size or h > max_size:
+            raise ValueError(f"{name} is {w}x{h}, larger than the {max_size}px atlas limit")
+
+    order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+    widest = max(w for w, h in sizes.values())
+
+    best = None
+    for page_width in range(widest, max_size + 1, 64):
+        placements, pages = shelf_pack(sizes, order, page_width, max_size, padding)
+        score = (len(pages), sum(w * h for w, h in pages))
+        if best is None or score < best[0]:
+            best = (score, placements, pages)
+
+    return best[1], best[2]
+
+def load_poses(input_dir, exclude=()):
+    """
+    Load every PNG or WebP pose in input_dir, sorted by name.
+    Each pose is read from the file metadata.json records for it (see pose_files),
+    so a stale PNG next to a newer WebP build is ignored.
+    """
+    return {name: Image.open(os.path.join(input_dir, filename))
+            for name, filename in pose_files(input_dir).items() if name not in exclude}
+
+def scale_sprite(image, scale, resample=DEFAULT_RESAMPLE):
+    """Resize a whole pose canvas by scale (premultiplied LANCZOS, so edges don't fringe)."""
+    if scale == 1.0:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return resize_sprite(image.convert('RGBA'), size, resample)
+
+def build_atlas(characters, output_dir, atlas_name, encode=DEFAULT_ENCODE, scale=1.0, aliases=None,
+                resample=DEFAULT_RESAMPLE, deltas=None):
+    """
+    Pack the poses of one or more characters into a single atlas.
+    characters is a list of (name, {pose: image}).
+    aliases maps a character to {alias pose: canonical pose}; an alias is not
+    packed, its frame reuses the canonical pose's pixels and meta.aliases lists it.
+    deltas maps a character to {frame: key frame}; only a delta frame's changed
+    rectangles are packed, listed in its frame's delta.patches and drawn over
+    the key frame with delta.regions cut out (meta.deltas lists them).
+    With scale != 1 every pose canvas is resized first (with the resample
+    profile) and meta.scale records the factor, so all frame values are in
+    scaled pixels.
+    Writes <atlas_name>.png (or <atlas_name>-N.png for extra pages, with the
+    encode profile's extension) and <atlas_name>.json, and returns the JSON data.
+    """
+    trimmed = {}
+    frames = {}
+    patches = {}
+
+    names = {char_name for char_name, _ in characters}
+    aliases = {char_name: char_aliases for char_name, char_aliases in (aliases or {}).items() if char_name in names}
+    deltas = {char_name: char_deltas for char_name, char_deltas in (deltas or {}).items() if char_name in names}
+    for char_name, poses in characters:
+        frames[char_name] = {}
+        scaled = {pose: scale_sprite(image, scale, resample) for pose, image in poses.items()
+                  if pose not in aliases.get(char_name, {})}
+        for pose, image in scaled.items():
+            key = deltas.get(char_name, {}).get(pose)
+            if key is not None:
+                # Diffed at this tier's scale, so the patches match the key frame's pixels
+                regions, frame_patches = encode_delta(scaled[key], image)
+                for index, (patch, x, y) in enumerate(frame_patches):
+                    trimmed[(char_name, pose, index)] = patch
+                patches[(char_name, pose)] = [(x, y) for _, x, y in frame_patches]
+                frames[char_name][pose] = {
+                    'sourceW': image.width,
+                    'sourceH': image.height,
+                    'delta': {'key': key, 'regions': [[left, top, right - left, bottom - top]
+                                                      for left, top, right, bottom in regions]}
+                }
+                continue
+            sprite, trim_x, trim_y = trim_sprite(image)
+            trimmed[(char_name, pose)] = sprite
+            frames[char_name][pose] = {
+                'trimX': trim_x,
+                'trimY': trim_y,
+                'w': sprite.width,
+                'h': sprite.height,
+                'sourceW': image.width,
+                'sourceH': image.height
+            }
+
+    sizes = {key: sprite.size for key, sprite in trimmed.items()}
+    placements, pages = pack_frames(sizes)
+
+    page_images = [Image.new('RGBA', size, (0, 0, 0, 0)) for size in pages]
+    for name, sprite in trimmed.items():
+        page, x, y = placements[name]
+        page_images[page].paste(sprite, (x, y))
+        if len(name) == 2:  # (character, pose); patches are (character, pose, index)
+            frames[name[0]][name[1]].update({'image': page, 'x': x, 'y': y})
+    for (char_name, pose), offsets in patches.items():
+        frame = frames[char_name][pose]
+        # Drawn like the key frame, then the patches over its cut-out regions
+        base = frames[char_name][frame['delta']['key']]
+        frame.update({field: base[field] for field in ('image', 'x', 'y', 'w', 'h', 'trimX', 'trimY')})
+        frame['delta']['patches'] = []
+        for index, (dx, dy) in enumerate(offsets):
+            page, x, y = placements[(char_name, pose, index)]
+            w, h = trimmed[(char_name, pose, index)].size
+            frame['delta']['patches'].append({'image': page, 'x': x, 'y': y, 'w': w, 'h': h, 'dx': dx, 'dy': dy})
+    for char_name, char_aliases in aliases.items():
+        for alias, canonical in char_aliases.items():
+            frames[char_name][alias] = dict(frames[char_name][canonical])
+
+    image_format = ENCODE_PROFILES[encode]['format']
+    image_names = []
+    for index, page_image in enumerate(page_images):
+        page_name = atlas_name if index == 0 else f"{atlas_name}-{index}"
+        image_name = f"{page_name}.{image_format}"
+        encode_image(page_image, os.path.join(output_dir, image_name), encode)
+        image_names.append(image_name)
+
+    atlas = {
+        'meta': {
+            'version': 1,
+            'format': image_format,
+            'images': image_names,
+            'sizes': [f"{w}x{h}" for w, h in pages],
+            'padding': PADDING
+        },
+        'frames': frames
+    }
+    if scale != 1.0:
+        atlas['meta']['scale'] = scale
+    if any(aliases.values()):
+        atlas['meta']['aliases'] = {char_name: dict(sorted(char_aliases.items()))
+                                    for char_name, char_aliases in aliases.items() if char_aliases}
+    if any(deltas.values()):
+        atlas['meta']['deltas'] = {char_name: dict(sorted(char_deltas.items()))
+                                   for char_name, char_deltas in deltas.items() if char_deltas}
+
+    with open(os.path.join(output_dir, f"{atlas_name}.json"), 'w') as f:
+        json.dump(atlas, f, indent=2)
+
+    return atlas
+
+def write_tier_index(output_dir, atlas_name, encode, tiers):
+    """
+    Write <atlas_name>.json listing only the tier atlases, and delete any
+    full-size pages left from an earlier build so they aren't shipped.
+    """
+    image_format = ENCODE_PROFILES[encode]['format']
+    page = re.compile(re.escape(atlas_name) + r'(-\d+)?\.(png|webp)$')
+    for filename in os.listdir(output_dir):
+        if page.match(filename):
+            os.remove(os.path.join(output_dir, filename))
+
+    index = {'meta': {'version': 1, 'format': image_format, 'tiers': tiers}}
+    with open(os.path.join(output_dir, f"{atlas_name}.json"), 'w') as f:
+        json.dump(index, f, indent=2)
+
+def report(atlas, source_pixels, output_dir):
+    """Print how much smaller the atlas is than the padded source canvases."""
+    atlas_pixels = 0
+    for size in atlas['meta']['sizes']:
+        w, h = (int(v) for v in size.split('x'))
+        atlas_pixels += w * h
+    atlas_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in atlas['meta']['images'])
+    frame_count = sum(len(poses) for poses in atlas['frames'].values())
+    alias_count = sum(len(char_aliases) for char_aliases in atlas['meta'].get('aliases', {}).values())
+    alias_note = f", {alias_count} aliased to another pose's pixels" if alias_count else ""
+    delta_count = sum(len(char_deltas) for char_deltas in atlas['meta'].get('deltas', {}).values())
+    alias_note += f", {delta_count} delta-encoded" if delta_count else ""
+
+    print(f"    Frames: {frame_count} in {len(atlas['meta']['images'])} image(s) ({', '.join(atlas['meta']['sizes'])})"
+          f"{alias_note}")
+    print(f"    Texture pixels: {source_pixels / 1e6:.1f}M -> {atlas_pixels / 1e6:.1f}M "
+          f"({100 * atlas_pixels / max(source_pixels, 1):.0f}%)")
+    print(f"    Atlas size: {atlas_bytes / 1024:.0f} KB")
+
+def main():
+    """Pack every character's normalized sprites into texture atlases."""
+    parser = argparse.ArgumentParser(description="Pack normalized sprites into texture atlases")
+    parser.add_argument('--shared', action='store_true',
+                        help="pack all characters into one shared atlas (atlas/sprites.png)")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"atlas image encoding (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--tiers', default=','.join(str(t) for t in DEFAULT_TIERS),
+                        help="comma-separated resolution tiers as multiples of the draw scale, "
+                             "empty for none (default: %(default)s)")
+    parser.add_argument('--alias-near', type=int, metavar='BITS',
+                        help="also alias near-duplicate poses within BITS of perceptual hash (lossy; "
+                             "exact duplicates are always packed once)")
+    parser.add_argument('--delta', action='store_true',
+                        help="pack later frames of animation sequences as patches over their key frame")
+    parser.add_argument('--min-savings', type=float, default=MIN_SAVINGS,
+                        help=f"with --delta, fraction of a frame's encoded bytes its patches must save "
+                             f"(default: {MIN_SAVINGS})")
+    parser.add_argument('--resample', choices=sorted(RESAMPLE_PROFILES), default=DEFAULT_RESAMPLE,
+                        help=f"downscale strategy for the tiers (default: {DEFAULT_RESAMPLE}; see resample_report.py)")
+    args = parser.parse_args()
+    densities = [float(t) for t in args.tiers.split(',') if t.strip()]
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    output_dir = os.path.join(base_dir, OUTPUT_DIR)
+    os.makedirs(output_dir, exist_ok=True)
+
+    print("Texture Atlas Packer")
+    print("=" * 50)
+
+    loaded = []
+    for char_name, input_dir, exclude in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if os.path.exists(input_path):
+            loaded.append((char_name, load_poses(input_path, exclude)))
+        else:
+            print(f"\nSkipping {char_name}: Directory {input_path} not found")
+
+    # Decided once at full size so every tier aliases the same poses
+    aliases = {char_name: alias_map(poses, args.alias_near) for char_name, poses in loaded}
+    for char_name, char_aliases in aliases.items():
+        for alias, canonical in char_aliases.items():
+            print(f"  {char_name}: {alias} -> {canonical}")
+
+    # Also decided at full size; aliased poses are already packed once
+    deltas = {}
+    if args.delta:
+        for char_name, poses in loaded:
+            deltas[char_name], sequences = plan_deltas(char_name, poses, args.min_savings, aliases[char_name],
+                                                     args.encode)
+            print_report(char_name, sequences)
+
+    if args.shared:
+        groups = [('sprites', loaded)]
+    else:
+        groups = [(char_name, [(char_name, poses)]) for char_name, poses in loaded]
+
+    for atlas_name, characters in groups:
+        print(f"\n  {atlas_name}:")
+        source_pixels = sum(image.width * image.height
+                            for _, poses in characters for image in poses.values())
+        # The game only ever loads a tier, so with tiers no full-size pages are packed
+        tiers = []
+        for density in densities:
+            tier_name = f"{atlas_name}@{density:g}x"
+            scale = round(DRAW_SCALE * density, 4)
+            tier_atlas = build_atlas(characters, output_dir, tier_name, args.encode, scale=scale, aliases=aliases,
+                                     resample=args.resample, deltas=deltas)
+            tier_bytes = sum(os.path.getsize(os.path.join(output_dir, name)) for name in tier_atlas['meta']['images'])
+            print(f"    Tier {density:g}x (scale {scale}): {', '.join(tier_atlas['meta']['sizes'])}, "
+                  f"{tier_bytes / 1024:.0f} KB")
+            tiers.append({'density': density, 'scale': scale, 'atlas': f"{tier_name}.json"})
+
+        if tiers:
+            write_tier_index(output_dir, atlas_name, args.encode, tiers)
+            report(tier_atlas, source_pixels, output_dir)
+        else:
+            atlas = build_atlas(characters, output_dir, atlas_name, args.encode, aliases=aliases, deltas=deltas)
+            report(atlas, source_pixels, output_dir)
+        print(f"    Saved {os.path.join(OUTPUT_DIR, atlas_name + '.json')}")
+
+    print("\n" + "=" * 50)
+    print("Packing complete!")
+
+if __name__ == "__main__":
+    main()
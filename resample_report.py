@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Resample Quality Report
+Times every resample profile on the downscales the build actually does
+(source sprites to the v3 height, v3 canvases to the atlas tiers) and scores
+each result against pure LANCZOS with PSNR and SSIM, so a build profile can
+trade speed for quality knowingly.
+"""
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+from sprite_pipeline import (CHARACTERS, RESAMPLE_PROFILES, DEFAULT_RESAMPLE, find_reference, load_source,
+                             pose_scale, resize_sprite)
+from pack_atlas import CHARACTERS as ATLAS_CHARACTERS, DRAW_SCALE, DEFAULT_TIERS, load_poses
+
+REPORT_FILE = 'resample_report.json'
+
+SSIM_WINDOW = 7     # Square window of the SSIM statistics
+MIN_PSNR = 40.0     # dB against LANCZOS; above this differences are not visible on sprites
+MIN_SSIM = 0.99
+
+def premultiplied(image):
+    """RGBA pixels as float64 with colour premultiplied, so invisible colour doesn't count."""
+    pixels = np.asarray(image.convert('RGBA'), dtype=np.float64)
+    pixels[..., :3] *= pixels[..., 3:] / 255
+    return pixels
+
+def psnr(reference, result):
+    """Peak signal-to-noise ratio in dB over all channels (inf if identical)."""
+    mse = np.mean((reference - result) ** 2)
+    return float('inf') if mse == 0 else float(10 * np.log10(255 ** 2 / mse))
+
+def window_means(channel, size=SSIM_WINDOW):
+    """Mean of every size x size window (valid positions only), via a summed-area table."""
+    table = np.pad(channel, ((1, 0), (1, 0))).cumsum(axis=0).cumsum(axis=1)
+    sums = table[size:, size:] - table[:-size, size:] - table[size:, :-size] + table[:-size, :-size]
+    return sums / (size * size)
+
+def ssim(reference, result, size=SSIM_WINDOW):
+    """Mean structural similarity over uniform windows, averaged across channels."""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    scores = []
+    for channel in range(reference.shape[2]):
+        x, y = reference[..., channel], result[..., channel]
+        mean_x, mean_y = window_means(x, size), window_means(y, size)
+        var_x = window_means(x * x, size) - mean_x ** 2
+        var_y = window_means(y * y, size) - mean_y ** 2
+        covariance = window_means(x * y, size) - mean_x * mean_y
+        scores.append(np.mean((2 * mean_x * mean_y + c1) * (2 * covariance + c2)
+                              / ((mean_x ** 2 + mean_y ** 2 + c1) * (var_x + var_y + c2))))
+    return float(np.mean(scores))
+
+def source_cases(base_dir):
+    """(name, cropped source, target size) for every source sprite, as the v3 profile resizes them."""
+    cases = []
+    reference_height = None
+    for char_name, input_dir in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if not os.path.exists(input_path):
+            continue
+        if reference_height is None:
+            # The first character's standing height is the v3 reference
+            _, bounds = load_source(os.path.join(input_path, find_reference(input_path)))
+            reference_height = bounds[3] - bounds[1]
+        for filename in sorted(f for f in os.listdir(input_path) if f.lower().endswith('.png')):
+            image, bounds = load_source(os.path.join(input_path, filename))
+            if bounds is None:
+                continue
+            cropped = image.crop(bounds)
+            scale = reference_height / cropped.height * pose_scale(filename)
+            cases.append((f"{char_name}/{filename}", cropped,
+                          (int(cropped.width * scale), int(cropped.height * scale))))
+    return cases
+
+def tier_cases(base_dir, scale):
+    """(name, v3 canvas, target size) for every pose packed into the atlases, as pack_atlas resizes them."""
+    cases = []
+    for char_name, input_dir, exclude in ATLAS_CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if not os.path.exists(input_path):
+            continue
+        for pose, image in load_poses(input_path, exclude).items():
+            image = image.convert('RGBA')
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            cases.append((f"{char_name}/{pose}", image, size))
+    return cases
+
+def measure(image, size, profiles, repeat):
+    """
+    Resize one image with each profile, keeping the fastest of repeat runs.
+    Returns {profile: {'ms', 'psnr', 'ssim'}}, scored against the first profile.
+    """
+    results = {}
+    reference = None
+    for name in profiles:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            resized = resize_sprite(image, size, name)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        pixels = premultiplied(resized)
+        if reference is None:
+            reference = pixels
+        results[name] = {
+            'ms': round(best * 1000, 2),
+            'psnr': round(psnr(reference, pixels), 2),
+            'ssim': round(ssim(reference, pixels), 5)
+        }
+    return results
+
+def main():
+    """Measure every resample profile on the build's downscales."""
+    parser = argparse.ArgumentParser(description="Compare resample profiles against pure LANCZOS")
+    parser.add_argument('--profiles', default=','.join(RESAMPLE_PROFILES),
+                        help=f"comma-separated resample profiles (default: {','.join(RESAMPLE_PROFILES)})")
+    parser.add_argument('--tiers', default=','.join(str(t) for t in DEFAULT_TIERS),
+                        help="comma-separated atlas tiers to measure, empty for none (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per resize, fastest kept (default: 3)")
+    parser.add_argument('--output', default=REPORT_FILE, help=f"JSON report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    # The first profile is the reference every other one is scored against
+    profiles = [DEFAULT_RESAMPLE] + [name for name in args.profiles.split(',') if name != DEFAULT_RESAMPLE]
+    unknown = [name for name in profiles if name not in RESAMPLE_PROFILES]
+    if unknown:
+        parser.error(f"unknown resample profile(s): {', '.join(unknown)}")
+    densities = [float(t) for t in args.tiers.split(',') if t.strip()]
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print("Resample Quality Report")
+    print("=" * 50)
+    print(f"Reference: {DEFAULT_RESAMPLE}, thresholds PSNR >= {MIN_PSNR:g} dB, SSIM >= {MIN_SSIM:g}")
+
+    stages = [('v3', source_cases(base_dir))]
+    for density in densities:
+        stages.append((f"tier {density:g}x", tier_cases(base_dir, round(DRAW_SCALE * density, 4))))
+
+    report = {'reference': DEFAULT_RESAMPLE, 'profiles': profiles, 'min_psnr': MIN_PSNR, 'min_ssim': MIN_SSIM,
+              'stages': {}}
+
+    for label, cases in stages:
+        if not cases:
+            print(f"\nSkipping {label}: no sprites found")
+            continue
+
+        ratios = [image.height / size[1] for _, image, size in cases]
+        print(f"\n  {label} ({len(cases)} sprite(s), source/target {min(ratios):.2f}x-{max(ratios):.2f}x):")
+
+        entries = {name: measure(image, size, profiles, args.repeat) for name, image, size in cases}
+        reference_ms = sum(entry[DEFAULT_RESAMPLE]['ms'] for entry in entries.values())
+        summary = {}
+        for profile in profiles:
+            total_ms = sum(entry[profile]['ms'] for entry in entries.values())
+            worst_psnr = min(entry[profile]['psnr'] for entry in entries.values())
+            worst_ssim = min(entry[profile]['ssim'] for entry in entries.values())
+            summary[profile] = {
+                'ms': round(total_ms, 1),
+                'speedup': round(reference_ms / max(total_ms, 1e-9), 2),
+                'min_psnr': worst_psnr,
+                'min_ssim': worst_ssim,
+                'passes': worst_psnr >= MIN_PSNR and worst_ssim >= MIN_SSIM
+            }
+            note = "" if summary[profile]['passes'] else "  <- below threshold"
+            print(f"    {profile:<8} {total_ms:8.1f} ms ({summary[profile]['speedup']:.2f}x)  "
+                  f"PSNR >= {worst_psnr:6.2f} dB  SSIM >= {worst_ssim:.5f}{note}")
+
+        passing = [profile for profile in profiles if summary[profile]['passes']]
+        fastest = min(passing, key=lambda profile: summary[profile]['ms'])
+        print(f"    Fastest within thresholds: {fastest}")
+
+        report['stages'][label] = {'summary': summary, 'fastest': fastest, 'sprites': entries}
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 """
 Scale down Elon's throw sprite by 20%
+
+Superseded by the 'cross' profile override in sprite_pipeline.py, which
+normalize_sprites_v3.py and sprite_pipeline.py both build: the 0.8 scale is
+applied while resizing from the source instead of re-encoding a v3 output.
 """
 
+import sys
 from PIL import Image
-import os
 
 def scale_sprite(input_path, output_path, scale_factor=0.8):
     """Scale down a sprite by the given factor."""
@@ -25,22 +29,10 @@ def scale_sprite(input_path, output_path, scale_factor=0.8):
     print(f"  New: {new_width}x{new_height}")
 
 def main():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Scale Elon's throw sprite
-    elon_throw = os.path.join(base_dir, 'elon/Elon1_normalized_v3/throw.png')
-    
-    if os.path.exists(elon_throw):
-        # Create backup first
-        backup_path = elon_throw.replace('.png', '_backup.png')
-        img = Image.open(elon_throw)
-        img.save(backup_path)
-        print(f"Created backup: {backup_path}")
-        
-        # Scale down by 20% (scale factor 0.8)
-        scale_sprite(elon_throw, elon_throw, 0.8)
-    else:
-        print(f"Error: {elon_throw} not found!")
+    # The 'cross' profile already scales the throw by 0.8; scaling the v3 output again would leave it at 0.64
+    print("scale_throw_sprite.py is superseded: Elon's throw is scaled by the 'cross' profile override.")
+    print("Run normalize_sprites_v3.py or sprite_pipeline.py --profiles cross instead.")
+    sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,20 +1,723 @@
 #!/usr/bin/env python3
-import http.server
-import socketserver
+"""
+Development server for the game.
+Serves the repo over HTTP/1.1 with a thread per connection, keep-alive,
+conditional requests (ETag / Last-Modified -> 304), byte ranges and
+zero-copy sendfile for file bodies, so several devices can load the game at once.
+Files are kept in a bounded in-memory LRU cache with gzip/brotli variants
+built once and picked per request from Accept-Encoding. Per-request timings
+are exposed as JSON at /__metrics. With --live-reload, rebuilt sprites and
+collision data are pushed to open pages as Server-Sent Events at /__events.
+"""
+
+import io
+import os
+import re
+import gzip
+import json
+import time
+import queue
 import socket
+import argparse
+import threading
+import email.utils
+import http.server
+import urllib.parse
+from collections import OrderedDict, deque
+from functools import partial
 
-# Get local IP
-hostname = socket.gethostname()
-local_ip = socket.gethostbyname(hostname)
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 PORT = 8000
+CACHE_MAX_MB = 64     # Total budget for cached file bytes, variants included
+CACHE_MAX_FILE_MB = 8  # Bigger files are streamed from disk with sendfile
+MIN_COMPRESS_SIZE = 1024
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+ENCODING_PREFERENCE = ['br', 'gzip']  # Best ratio first
+
+METRICS_PATH = '/__metrics'
+METRICS_WINDOW = 5000  # Recent samples kept per asset class for percentiles
+BACKGROUND_IMAGES = ('ChatGPT Image Jul 31, 2025, 08_46_53 PM.png',)
+BACKGROUND_DIR = 'backgrounds/'  # Pre-scaled tiers from build_backgrounds.py
+SPRITE_EXTENSIONS = ('.png', '.webp', '.json')
+
+# Content-hashed copies written by hash_assets.py never change, so browsers may keep them forever
+HASHED_DIR = 'hashed/'
+HASHED_NAME = re.compile(r'\.[0-9a-f]{8}(\.\w+)$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Live reload: files the page loads from disk, polled for changes (see watch_sprites.py)
+EVENTS_PATH = '/__events'
+LIVE_RELOAD_TARGETS = ['index.html', 'elon/Elon1_normalized_v3', 'trump1_normalized_v3', 'collision']
+LIVE_RELOAD_EXTENSIONS = ('.png', '.webp', '.json', '.html')
+POLL_INTERVAL = 0.1     # Seconds between scans of the live-reload targets
+HEARTBEAT_INTERVAL = 15  # Seconds between keep-alive comments on an idle event stream
+
+def parse_range(header, size):
+    """
+    Parse a single 'bytes=' range against a file size.
+    Returns (start, end) with end exclusive, 'unsatisfiable', or None when the
+    header should be ignored (malformed or multiple ranges).
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                return 'unsatisfiable'
+            return (max(size - length, 0), size)
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+
+    if start >= size or end <= start:
+        return 'unsatisfiable'
+    return (start, min(end, size))
+
+def compress_variants(data, content_type):
+    """
+    Build the compressed encodings worth serving for a file.
+    Returns {encoding: bytes}, keeping only variants smaller than the original.
+    """
+    if len(data) < MIN_COMPRESS_SIZE or not content_type.startswith(COMPRESSIBLE_TYPES):
+        return {}
+
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {encoding: body for encoding, body in variants.items() if len(body) < len(data)}
+
+def accepted_encodings(header):
+    """Content codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+class AssetCache:
+    """
+    Bounded in-memory cache of file bytes keyed by path and mtime.
+    Each entry holds the raw bytes plus any precompressed variants; the least
+    recently used entries are evicted once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes, max_file):
+        self.max_bytes = max_bytes
+        self.max_file = max_file
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, path, stat):
+        """Return the cached entry for path if it matches stat, otherwise None."""
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is None:
+                return None
+            if entry['mtime_ns'] != stat.st_mtime_ns or entry['size'] != stat.st_size:
+                self._discard(path)
+                return None
+            self.entries.move_to_end(path)
+            return entry
+
+    def load(self, path, stat, content_type):
+        """
+        Read path into the cache and return its entry, or None when the file
+        is too large to cache or changed while being read.
+        """
+        if stat.st_size > self.max_file:
+            return None
+
+        with open(path, 'rb') as f:
+            current = os.fstat(f.fileno())
+            if current.st_mtime_ns != stat.st_mtime_ns or current.st_size != stat.st_size:
+                return None
+            data = f.read()
+
+        variants = {'identity': data}
+        variants.update(compress_variants(data, content_type))
+        entry = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'variants': variants,
+            'bytes': sum(len(body) for body in variants.values())
+        }
+
+        with self.lock:
+            self._discard(path)
+            self.entries[path] = entry
+            self.total_bytes += entry['bytes']
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.total_bytes -= evicted['bytes']
+        return entry
+
+    def _discard(self, path):
+        """Drop an entry (caller holds the lock)."""
+        entry = self.entries.pop(path, None)
+        if entry is not None:
+            self.total_bytes -= entry['bytes']
+
+def logical_name(url_path):
+    """Repo-relative file name for a request path, with any hashed/ copy mapped back to its source."""
+    name = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path).lstrip('/')
+    if name.startswith(HASHED_DIR):
+        name = HASHED_NAME.sub(r'\1', name[len(HASHED_DIR):])
+    return name
+
+def is_hashed_asset(url_path):
+    """True for a content-hashed copy, whose bytes are fixed by its name."""
+    name = urllib.parse.unquote(urllib.parse.urlsplit(url_path).path).lstrip('/')
+    return name.startswith(HASHED_DIR) and HASHED_NAME.search(name) is not None
+
+def asset_class(url_path):
+    """Group a request path into html / background / sprite / other."""
+    name = logical_name(url_path)
+    if name == '' or name.endswith(('/', '.html', '.htm')):
+        return 'html'
+    if name in BACKGROUND_IMAGES or name.startswith(BACKGROUND_DIR):
+        return 'background'
+    if name.lower().endswith(SPRITE_EXTENSIONS):
+        return 'sprite'
+    return 'other'
+
+def scan_files(root, targets, extensions=LIVE_RELOAD_EXTENSIONS):
+    """
+    {relative path: (mtime_ns, size)} for the targets, each a file or a flat
+    directory. Dotfiles such as build manifests are skipped.
+    """
+    files = {}
+    for target in targets:
+        path = os.path.join(root, target)
+        if os.path.isfile(path):
+            entries = [(target, path)]
+        elif os.path.isdir(path):
+            entries = [(f"{target}/{entry.name}", entry.path) for entry in os.scandir(path)
+                       if not entry.name.startswith('.') and entry.name.lower().endswith(extensions)]
+        else:
+            continue
+        for name, file_path in entries:
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue  # Deleted between listing and stat
+            files[name] = (stat.st_mtime_ns, stat.st_size)
+    return files
+
+def watch_files(root, targets, interval=POLL_INTERVAL, extensions=LIVE_RELOAD_EXTENSIONS):
+    """
+    Poll the targets forever, yielding a sorted list of changed paths (deleted
+    ones included) whenever some settle. A file is reported once it looks the
+    same on two polls in a row, so half-written files are never picked up.
+    """
+    known = scan_files(root, targets, extensions)
+    pending = {}
+    while True:
+        time.sleep(interval)
+        current = scan_files(root, targets, extensions)
+        changed = {path: current.get(path) for path in current.keys() | known.keys()
+                   if current.get(path) != known.get(path)}
+        settled = sorted(path for path, state in changed.items() if pending.get(path) == state)
+        for path in settled:
+            if changed[path] is None:
+                known.pop(path, None)
+            else:
+                known[path] = changed[path]
+        pending = {path: state for path, state in changed.items() if path not in settled}
+        if settled:
+            yield settled
+
+class LiveReload:
+    """Sends the paths of changed live-reload targets to every open /__events stream."""
+
+    def __init__(self, root, targets=LIVE_RELOAD_TARGETS, interval=POLL_INTERVAL):
+        self.root = root
+        self.targets = targets
+        self.interval = interval
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        """Register an event stream; returns the queue its messages arrive on."""
+        messages = queue.SimpleQueue()
+        with self.lock:
+            self.clients.add(messages)
+        return messages
+
+    def unsubscribe(self, messages):
+        """Forget a closed event stream."""
+        with self.lock:
+            self.clients.discard(messages)
+
+    def broadcast(self, data):
+        """Queue one event for every open stream."""
+        message = f"data: {json.dumps(data)}\n\n"
+        with self.lock:
+            for messages in self.clients:
+                messages.put(message)
+
+    def run(self):
+        """Poll forever (run in a daemon thread)."""
+        for files in watch_files(self.root, self.targets, self.interval):
+            with self.lock:
+                clients = len(self.clients)
+            print(f"Live reload: {', '.join(files)} -> {clients} client(s)")
+            self.broadcast({'files': files})
+
+    def start(self):
+        """Start polling in the background."""
+        threading.Thread(target=self.run, name='live-reload', daemon=True).start()
+
+def percentiles(values, points=(50, 95, 99)):
+    """Nearest-rank percentiles of values, as {'p50': ..., ...}."""
+    if not values:
+        return {f'p{point}': None for point in points}
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        rank = max(1, -(-point * len(ordered) // 100))  # ceil(point% of n)
+        result[f'p{point}'] = round(ordered[rank - 1], 3)
+    return result
+
+class RequestMetrics:
+    """
+    Thread-safe request statistics: totals per path and per asset class, and a
+    rolling window of time-to-first-byte / total times per class for percentiles.
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.started = time.time()
+        self.window = window
+        self.paths = {}
+        self.classes = {}
+        self.lock = threading.Lock()
+
+    def record(self, path, status, bytes_sent, ttfb_ms, total_ms, cache_status):
+        """Add one finished request."""
+        url_path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        name = asset_class(url_path)
+        with self.lock:
+            stats = self.classes.get(name)
+            if stats is None:
+                stats = self.classes[name] = {
+                    'requests': 0, 'bytes': 0, 'cache_hits': 0, 'cache_misses': 0, 'statuses': {},
+                    'ttfb': deque(maxlen=self.window), 'total': deque(maxlen=self.window)
+                }
+            stats['requests'] += 1
+            stats['bytes'] += bytes_sent
+            stats['statuses'][str(status)] = stats['statuses'].get(str(status), 0) + 1
+            stats['ttfb'].append(ttfb_ms)
+            stats['total'].append(total_ms)
+            if cache_status == 'hit':
+                stats['cache_hits'] += 1
+            elif cache_status == 'miss':
+                stats['cache_misses'] += 1
+
+            entry = self.paths.get(url_path)
+            if entry is None:
+                entry = self.paths[url_path] = {
+                    'class': name, 'requests': 0, 'bytes': 0, 'cache_hits': 0, 'cache_misses': 0,
+                    'ttfb_ms_total': 0.0, 'total_ms_total': 0.0, 'total_ms_max': 0.0
+                }
+            entry['requests'] += 1
+            entry['bytes'] += bytes_sent
+            entry['ttfb_ms_total'] += ttfb_ms
+            entry['total_ms_total'] += total_ms
+            entry['total_ms_max'] = max(entry['total_ms_max'], total_ms)
+            if cache_status == 'hit':
+                entry['cache_hits'] += 1
+            elif cache_status == 'miss':
+                entry['cache_misses'] += 1
+
+    def snapshot(self):
+        """Current metrics as a JSON-ready dict."""
+        with self.lock:
+            classes = {}
+            for name, stats in sorted(self.classes.items()):
+                classes[name] = {
+                    'requests': stats['requests'],
+                    'bytes': stats['bytes'],
+                    'cache_hits': stats['cache_hits'],
+                    'cache_misses': stats['cache_misses'],
+                    'statuses': dict(stats['statuses']),
+                    'ttfb_ms': percentiles(stats['ttfb']),
+                    'total_ms': percentiles(stats['total'])
+                }
+            paths = {}
+            for url_path, entry in sorted(self.paths.items()):
+                paths[url_path] = {
+                    'class': entry['class'],
+                    'requests': entry['requests'],
+                    'bytes': entry['bytes'],
+                    'cache_hits': entry['cache_hits'],
+                    'cache_misses': entry['cache_misses'],
+                    'avg_ttfb_ms': round(entry['ttfb_ms_total'] / entry['requests'], 3),
+                    'avg_total_ms': round(entry['total_ms_total'] / entry['requests'], 3),
+                    'max_total_ms': round(entry['total_ms_max'], 3)
+                }
+
+        return {
+            'uptime_s': round(time.time() - self.started, 1),
+            'requests': sum(stats['requests'] for stats in classes.values()),
+            'bytes_sent': sum(stats['bytes'] for stats in classes.values()),
+            'classes': classes,
+            'paths': paths
+        }
+
+    def print_summary(self, top=10):
+        """Print per-class latency percentiles and the slowest paths."""
+        data = self.snapshot()
+        print(f"\nRequest summary ({data['requests']} requests, "
+              f"{data['bytes_sent'] / 1024 / 1024:.1f} MB sent, {data['uptime_s']:.0f}s uptime)")
+        print(f"  {'class':<12}{'reqs':>7}{'MB':>8}{'hit%':>7}"
+              f"{'ttfb p50':>10}{'p95':>8}{'p99':>8}{'total p50':>11}{'p95':>8}{'p99':>8}")
+        for name, stats in data['classes'].items():
+            lookups = stats['cache_hits'] + stats['cache_misses']
+            hit_rate = f"{100 * stats['cache_hits'] / lookups:.0f}" if lookups else '-'
+            ttfb, total = stats['ttfb_ms'], stats['total_ms']
+            print(f"  {name:<12}{stats['requests']:>7}{stats['bytes'] / 1024 / 1024:>8.1f}{hit_rate:>7}"
+                  f"{ttfb['p50']:>10.1f}{ttfb['p95']:>8.1f}{ttfb['p99']:>8.1f}"
+                  f"{total['p50']:>11.1f}{total['p95']:>8.1f}{total['p99']:>8.1f}")
+
+        slowest = sorted(data['paths'].items(), key=lambda item: -item[1]['avg_total_ms'])[:top]
+        if slowest:
+            print(f"\n  Slowest paths (avg total ms):")
+            for url_path, entry in slowest:
+                print(f"    {entry['avg_total_ms']:>8.1f}  {url_path} ({entry['requests']} reqs)")
+
+class AssetRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Static file handler with keep-alive, validators, ranges and sendfile."""
+
+    protocol_version = 'HTTP/1.1'  # Persistent connections
+    timeout = 30                   # Drop idle keep-alive connections
+
+    def handle_one_request(self):
+        """Handle one request and record its timings."""
+        self.request_start = None
+        super().handle_one_request()
+        metrics = self.server.metrics
+        path = getattr(self, 'path', '')
+        if (metrics is None or self.request_start is None
+                or path.startswith(METRICS_PATH) or path.startswith(EVENTS_PATH)):
+            return
+
+        done = time.perf_counter()
+        first_byte = self.first_byte or done
+        metrics.record(path, self.status_code, self.bytes_sent,
+                       (first_byte - self.request_start) * 1000, (done - self.request_start) * 1000,
+                       self.cache_status)
+
+    def parse_request(self):
+        # The request line has just been read: start the clock for this request
+        self.request_start = time.perf_counter()
+        self.first_byte = None
+        self.status_code = None
+        self.bytes_sent = 0
+        self.cache_status = None
+        return super().parse_request()
+
+    def send_response_only(self, code, message=None):
+        self.status_code = code
+        super().send_response_only(code, message)
+
+    def flush_headers(self):
+        super().flush_headers()
+        if self.request_start is not None and self.first_byte is None:
+            self.first_byte = time.perf_counter()
+
+    def end_headers(self):
+        if is_hashed_asset(getattr(self, 'path', '')):
+            self.send_header('Cache-Control', IMMUTABLE_CACHE_CONTROL)
+        else:
+            # Revalidate every time; unchanged files come back as cheap 304s
+            self.send_header('Cache-Control', 'no-cache')
+        super().end_headers()
+
+    def resolve_path(self):
+        """
+        Map the request to a file on disk, following SimpleHTTPRequestHandler's
+        directory rules. Returns the file path, or None if the base class
+        should answer (redirects and directory listings).
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return None
+            for index in ('index.html', 'index.htm'):
+                index_path = os.path.join(path, index)
+                if os.path.isfile(index_path):
+                    return index_path
+            return None
+        return path
+
+    def etag_for(self, stat, encoding='identity'):
+        """Strong validator from the file's mtime and size, distinct per encoding."""
+        if encoding == 'identity':
+            return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-{encoding}"'
+
+    def choose_encoding(self, variants):
+        """Pick the smallest variant the client accepts."""
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in variants and encoding in accepted:
+                return encoding
+        return 'identity'
+
+    def is_not_modified(self, etag, mtime):
+        """Evaluate If-None-Match, falling back to If-Modified-Since."""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return since is not None and int(mtime) <= since.timestamp()
+        return False
+
+    def range_is_current(self, etag, mtime):
+        """If-Range: only honour Range when the client's copy is still current."""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == etag
+        try:
+            return int(mtime) <= email.utils.parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+    def send_head(self):
+        """Send the response headers and return the body as a file object, or None."""
+        self.body_range = None
+        if urllib.parse.urlsplit(self.path).path == METRICS_PATH and self.server.metrics is not None:
+            return self.send_metrics()
+        if (urllib.parse.urlsplit(self.path).path == EVENTS_PATH and self.command == 'GET'
+                and self.server.live_reload is not None):
+            self.stream_events()
+            return None
+
+        path = self.resolve_path()
+        if path is None:
+            return super().send_head()
+        if path.endswith('/'):
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        content_type = self.guess_type(path)
+        cache = self.server.cache
+        entry = None
+        if cache is not None:
+            entry = cache.get(path, stat)
+            if entry is not None:
+                self.cache_status = 'hit'
+            else:
+                entry = cache.load(path, stat, content_type)
+                self.cache_status = 'miss' if entry is not None else 'bypass'
+
+        # Ranges are always served from the identity encoding
+        encoding = 'identity'
+        if entry is not None and 'Range' not in self.headers:
+            encoding = self.choose_encoding(entry['variants'])
+        varies = entry is not None and len(entry['variants']) > 1
+
+        etag = self.etag_for(stat, encoding)
+        last_modified = self.date_time_string(stat.st_mtime)
+
+        if self.is_not_modified(etag, stat.st_mtime):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            if varies:
+                self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return None
+
+        size = len(entry['variants'][encoding]) if entry is not None else stat.st_size
+        start, end = 0, size
+        status = 200
+        range_header = self.headers.get('Range')
+        if range_header and self.range_is_current(etag, stat.st_mtime):
+            byte_range = parse_range(range_header, size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+
+        if entry is not None:
+            f = io.BytesIO(entry['variants'][encoding])
+        else:
+            try:
+                f = open(path, 'rb')
+            except OSError:
+                self.send_error(404, "File not found")
+                return None
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        if varies:
+            self.send_header('Vary', 'Accept-Encoding')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end - 1}/{size}')
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+
+        self.body_range = (start, end - start)
+        return f
+
+    def send_metrics(self):
+        """Answer /__metrics with the current request statistics."""
+        body = json.dumps(self.server.metrics.snapshot(), indent=2).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.body_range = (0, len(body))
+        return io.BytesIO(body)
+
+    def stream_events(self):
+        """Hold /__events open, forwarding live-reload messages until the client goes away."""
+        live_reload = self.server.live_reload
+        messages = live_reload.subscribe()
+        # The stream has no length, so it can only end with the connection
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            self.wfile.write(b'retry: 1000\n\n')  # Reconnect quickly after a server restart
+            while True:
+                try:
+                    message = messages.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    message = ': ping\n\n'  # Comment line, keeps proxies and phones from dropping the stream
+                self.wfile.write(message.encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError, socket.timeout):
+            pass
+        finally:
+            live_reload.unsubscribe(messages)
+
+    def copyfile(self, source, outputfile):
+        """
+        Send the body: cached files straight from memory, everything else with
+        socket.sendfile (zero-copy where the OS supports it).
+        """
+        if self.body_range is None:
+            # Directory listings are in-memory buffers
+            self.bytes_sent += len(source.getvalue())
+            return super().copyfile(source, outputfile)
+
+        offset, count = self.body_range
+        try:
+            if not count:
+                return
+            if isinstance(source, io.BytesIO):
+                body = source.getvalue()
+                outputfile.write(body if count == len(body) else body[offset:offset + count])
+            else:
+                self.connection.sendfile(source, offset, count)
+            self.bytes_sent += count
+        except (BrokenPipeError, ConnectionResetError):
+            # Client went away mid-transfer (e.g. a phone navigating away)
+            self.close_connection = True
+
+class AssetServer(http.server.ThreadingHTTPServer):
+    """Thread-per-connection server so keep-alive clients don't queue behind each other."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128  # Room for every device's burst of sprite requests
+    cache = None              # AssetCache, or None to always read from disk
+    metrics = None            # RequestMetrics, or None to skip instrumentation
+    live_reload = None        # LiveReload, or None to answer /__events with 404
+
+def get_local_ip():
+    """Best-effort LAN address for the phone URL."""
+    try:
+        return socket.gethostbyname(socket.gethostname())
+    except OSError:
+        return '127.0.0.1'
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the game to devices on the local network")
+    parser.add_argument('--port', type=int, default=PORT, help=f"port to listen on (default: {PORT})")
+    parser.add_argument('--bind', default='', help="address to bind (default: all interfaces)")
+    parser.add_argument('--directory', default=os.getcwd(), help="directory to serve (default: current dir)")
+    parser.add_argument('--cache-size', type=int, default=CACHE_MAX_MB,
+                        help=f"in-memory cache budget in MB, 0 disables (default: {CACHE_MAX_MB})")
+    parser.add_argument('--metrics-summary', action='store_true',
+                        help="print per-class latency percentiles when the server stops")
+    parser.add_argument('--live-reload', action='store_true',
+                        help=f"push changed sprites to open pages over {EVENTS_PATH} (pair with watch_sprites.py)")
+    args = parser.parse_args()
+
+    local_ip = get_local_ip()
+    handler = partial(AssetRequestHandler, directory=args.directory)
 
-Handler = http.server.SimpleHTTPRequestHandler
+    with AssetServer((args.bind, args.port), handler) as httpd:
+        if args.cache_size > 0:
+            httpd.cache = AssetCache(args.cache_size * 1024 * 1024, CACHE_MAX_FILE_MB * 1024 * 1024)
+        httpd.metrics = RequestMetrics()
+        if args.live_reload:
+            httpd.live_reload = LiveReload(args.directory)
+            httpd.live_reload.start()
+        print(f"Server running at:")
+        print(f"  Local: http://localhost:{args.port}/index.html")
+        print(f"  Network: http://{local_ip}:{args.port}/index.html")
+        if httpd.cache is not None:
+            encodings = ', '.join(e for e in ENCODING_PREFERENCE if e != 'br' or brotli is not None)
+            print(f"  Cache: {args.cache_size} MB in memory ({encodings})")
+        print(f"  Metrics: http://localhost:{args.port}{METRICS_PATH}")
+        if httpd.live_reload is not None:
+            print(f"  Live reload: {', '.join(LIVE_RELOAD_TARGETS)} every {POLL_INTERVAL * 1000:.0f} ms")
+        print(f"\nAccess from your phone using the Network URL above")
+        print("Press Ctrl+C to stop")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+            if args.metrics_summary:
+                httpd.metrics.print_summary()
 
-with socketserver.TCPServer(("", PORT), Handler) as httpd:
-    print(f"Server running at:")
-    print(f"  Local: http://localhost:{PORT}/fighter_enhanced.html")
-    print(f"  Network: http://{local_ip}:{PORT}/fighter_enhanced.html")
-    print(f"\nAccess from your phone using the Network URL above")
-    print("Press Ctrl+C to stop")
-    httpd.serve_forever()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Spritesheet Slicer
+Finds each pose on the Gemini-generated sheets with a vectorized foreground mask
+(ground shadows keyed out), connected-component labelling, splitting of poses
+joined by a limb or projectile and gap merging, then feeds every frame straight
+into the sprite pipeline's output profiles without writing intermediate PNGs.
+"""
+
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+import numpy as np
+from sprite_pipeline import (PROFILES, CHARACTERS, ALPHA_THRESHOLD, ENCODE_PROFILES, DEFAULT_ENCODE,
+                             alpha_bounds, load_source, find_reference, profile_params,
+                             process_source, encoded_filename)
+
+# Raw sheets per character: (character, sheet dir)
+SHEETS = [
+    ('elon', 'elon/spritesheets'),
+    ('trump', 'trump1/trumpSpritesheets - ignore')
+]
+
+BACKGROUND_TOLERANCE = 32  # Max channel difference still treated as background
+SHADOW_DEPTH = 0.35        # Ground shadows: the background darkened evenly by up to this share
+CELL_SIZE = 4              # Mask is reduced to CELL_SIZE x CELL_SIZE cells before labelling
+ATTACH_GAP = 3             # Cells between a small piece (fist, fireball) and the pose it belongs to
+MIN_AREA_RATIO = 0.1       # Components smaller than this fraction of the largest are pieces, not poses
+TORSO_DENSITY = 0.5        # Torso columns hold at least this share of a component's densest column
+TORSO_WIDTH_RATIO = 0.12   # ...and span at least this share of its height
+VALLEY_RATIO = 0.25        # Two torsos whose thinnest column between them is below this share are two poses
+
+def background_colors(rgb, max_colors=4):
+    """
+    Estimate the sheet background from its border pixels.
+    Returns up to max_colors colours that each cover at least 5% of the border,
+    which handles both flat backgrounds and fake transparency checkerboards.
+    """
+    border = np.concatenate([rgb[0], rgb[-1], rgb[:, 0], rgb[:, -1]]).astype(np.int16)
+    # Bucket to 8 levels per channel so JPEG-ish noise falls into the same colour
+    buckets = border // 8
+    keys = (buckets[:, 0] << 10) | (buckets[:, 1] << 5) | buckets[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+
+    colors = []
+    for index in np.argsort(-counts)[:max_colors]:
+        if counts[index] < 0.05 * len(border):
+            break
+        colors.append(border[inverse.ravel() == index].mean(axis=0))
+    return np.array(colors, dtype=np.int16)
+
+def find_runs(mask):
+    """
+    Horizontal runs of set pixels in a boolean mask, found with one vectorized diff.
+    Returns (rows, starts, ends) arrays in row-major order; ends are exclusive.
+    """
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # Row-major order pairs them with the starts
+    return rows, starts, ends
+
+def label_runs(rows, starts, ends, height):
+    """
+    Join runs that touch on neighbouring rows (8-connected) with union-find.
+    Returns an array giving each run a component label 0..N-1.
+    """
+    count = len(rows)
+    parent = list(range(count))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    row_offsets = np.searchsorted(rows, np.arange(height + 1)).tolist()
+    starts = starts.tolist()
+    ends = ends.tolist()
+
+    for row in range(height - 1):
+        i, i_end = row_offsets[row], row_offsets[row + 1]
+        j, j_end = row_offsets[row + 1], row_offsets[row + 2]
+        while i < i_end and j < j_end:
+            # Diagonal neighbours count, so runs touching at a corner connect
+            if starts[i] <= ends[j] and starts[j] <= ends[i]:
+                root_i, root_j = find(i), find(j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+            if ends[i] < ends[j]:
+                i += 1
+            else:
+                j += 1
+
+    roots = np.array([find(i) for i in range(count)], dtype=np.int64)
+    return np.unique(roots, return_inverse=True)[1].ravel()
+
+def component_boxes(rows, starts, ends, labels):
+    """Per-label (left, top, right, bottom, pixel count) from labelled runs."""
+    count = int(labels.max()) + 1 if len(labels) else 0
+    lefts = np.full(count, np.iinfo(np.int64).max)
+    rights = np.zeros(count, dtype=np.int64)
+    tops = np.full(count, np.iinfo(np.int64).max)
+    bottoms = np.zeros(count, dtype=np.int64)
+    areas = np.zeros(count, dtype=np.int64)
+    np.minimum.at(lefts, labels, starts)
+    np.maximum.at(rights, labels, ends)
+    np.minimum.at(tops, labels, rows)
+    np.maximum.at(bottoms, labels, rows + 1)
+    np.add.at(areas, labels, ends - starts)
+    return [tuple(int(v) for v in box) for box in zip(lefts, tops, rights, bottoms, areas)]
+
+def paint_runs(shape, rows, starts, ends, values):
+    """An int32 grid with each run filled with its value and -1 elsewhere."""
+    grid = np.full(shape, -1, dtype=np.int32)
+    lengths = ends - starts
+    fill_rows = np.repeat(rows, lengths)
+    fill_cols = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+    grid[fill_rows, fill_cols] = np.repeat(values, lengths)
+    return grid
+
+def label_grid(mask):
+    """
+    8-connected components of a boolean mask, per pixel.
+    Returns (labels, boxes): labels is an int32 grid of component indexes
+    (-1 where the mask is unset), boxes the component_boxes() of each.
+    """
+    rows, starts, ends = find_runs(mask)
+    if len(rows) == 0:
+        return np.full(mask.shape, -1, dtype=np.int32), []
+    labels = label_runs(rows, starts, ends, mask.shape[0])
+    return paint_runs(mask.shape, rows, starts, ends, labels), component_boxes(rows, starts, ends, labels)
+
+def shadow_mask(rgb, color, tolerance=BACKGROUND_TOLERANCE, depth=SHADOW_DEPTH):
+    """
+    Pixels that are the background colour darkened evenly (ground shadows):
+    every channel is darker by about the same amount, at most depth of the colour.
+    """
+    darkening = color - rgb
+    spread = darkening.max(axis=2) - darkening.min(axis=2)
+    amount = darkening.mean(axis=2)
+    return (spread < tolerance // 2) & (amount > 0) & (amount <= color.mean() * depth)
+
+def foreground_alpha(image, tolerance=BACKGROUND_TOLERANCE):
+    """
+    Alpha channel for a sheet as a uint8 array.
+    Sheets with real transparency use their own alpha. Opaque sheets are
+    keyed against their background colours with a soft edge, and ground
+    shadows (see shadow_mask) are keyed out so they don't inflate a pose's
+    bounds; only regions connected to the sheet border are keyed, so white
+    shirts and other enclosed light or grey areas stay opaque.
+    """
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        return np.asarray(image.convert('RGBA').getchannel('A'))
+
+    rgb = np.asarray(image.convert('RGB')).astype(np.int16)
+    distance = np.full(rgb.shape[:2], 255, dtype=np.int16)
+    shadow = np.zeros(rgb.shape[:2], dtype=bool)
+    for color in background_colors(rgb):
+        distance = np.minimum(distance, np.abs(rgb - color).max(axis=2))
+        shadow |= shadow_mask(rgb, color, tolerance)
+
+    # Ramp from transparent at half the tolerance to opaque at the tolerance
+    low = tolerance // 2
+    alpha = np.clip((distance.astype(np.int32) - low) * 255 // max(tolerance - low, 1), 0, 255).astype(np.uint8)
+    alpha[shadow] = 0
+
+    # Background- or shadow-coloured components that don't touch the border are holes in a pose
+    height, width = alpha.shape
+    rows, starts, ends = find_runs((distance < tolerance) | shadow)
+    if len(rows):
+        labels = label_runs(rows, starts, ends, height)
+        boxes = component_boxes(rows, starts, ends, labels)
+        is_hole = np.array([left > 0 and top > 0 and right < width and bottom < height
+                            for left, top, right, bottom, _ in boxes])
+        hole_runs = np.nonzero(is_hole[labels])[0]
+        if len(hole_runs):
+            holes = paint_runs(alpha.shape, rows[hole_runs], starts[hole_runs], ends[hole_runs], labels[hole_runs])
+            alpha[holes >= 0] = 255
+
+    return alpha
+
+def reduce_mask(mask, cell=CELL_SIZE):
+    """Downsample a boolean mask so a cell is set if any of its pixels is set."""
+    height, width = mask.shape
+    padded = np.zeros((-(-height // cell) * cell, -(-width // cell) * cell), dtype=bool)
+    padded[:height, :width] = mask
+    return padded.reshape(padded.shape[0] // cell, cell, padded.shape[1] // cell, cell).any(axis=(1, 3))
+
+def box_gap(a, b):
+    """Empty space between two (left, top, right, bottom, ...) boxes; 0 if they overlap."""
+    dx = max(a[0] - b[2], b[0] - a[2], 0)
+    dy = max(a[1] - b[3], b[1] - a[3], 0)
+    return max(dx, dy)
+
+def reading_order(boxes):
+    """Sort boxes into rows (by vertical overlap) and then left to right."""
+    rows = []
+    for box in sorted(boxes, key=lambda b: (b[1] + b[3]) / 2):
+        center = (box[1] + box[3]) / 2
+        for row in rows:
+            if row['top'] <= center <= row['bottom']:
+                row['boxes'].append(box)
+                break
+        else:
+            rows.append({'top': box[1], 'bottom': box[3], 'boxes': [box]})
+    return [box for row in rows for box in sorted(row['boxes'], key=lambda b: b[0])]
+
+def torso_cuts(mask, density=TORSO_DENSITY, width_ratio=TORSO_WIDTH_RATIO, valley_ratio=VALLEY_RATIO):
+    """
+    Columns at which to cut one component's cell mask into separate poses.
+    A torso-sized mass is a run of columns holding at least density of the
+    densest column's cells, at least width_ratio of the mask's height wide.
+    Neighbouring masses whose thinnest column in between holds at most
+    valley_ratio of the smaller mass's peak are two poses joined by a limb or
+    a projectile, and are cut at that column.
+    """
+    counts = mask.sum(axis=0)
+    dense = (counts >= counts.max() * density).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], dense, [0]))))
+    masses = [(start, end) for start, end in zip(edges[0::2].tolist(), edges[1::2].tolist())
+              if end - start >= width_ratio * mask.shape[0]]
+
+    cuts = []
+    for (start, end), (next_start, next_end) in zip(masses, masses[1:]):
+        valley = counts[end:next_start]
+        if valley.min() <= valley_ratio * min(counts[start:end].max(), counts[next_start:next_end].max()):
+            cuts.append(end + int(valley.argmin()))
+    return cuts
+
+def find_frames(alpha, cell=CELL_SIZE, attach_gap=ATTACH_GAP, min_area_ratio=MIN_AREA_RATIO):
+    """
+    Locate every pose on a sheet from its alpha channel.
+    Components are labelled on a reduced cell grid, and a component holding
+    two torso-sized masses is cut into two poses (see torso_cuts). Small
+    pieces (detached fists, fireballs) join the single nearest pose within
+    attach_gap cells; anything else small (text labels, watermarks) is dropped.
+    Returns (box, mask) in reading order: exact pixel bounds (left, top,
+    right, bottom) and a boolean mask of the box's pixels that belong to the
+    pose, so a piece or neighbour overlapping the box isn't cut out with it.
+    """
+    cells = reduce_mask(alpha > ALPHA_THRESHOLD, cell)
+    labels, components = label_grid(cells)
+    if not components:
+        return []
+
+    largest = max(component[4] for component in components)
+    poses = []
+    pieces = []
+    for index, (left, top, right, bottom, area) in enumerate(components):
+        if area < largest * min_area_ratio:
+            pieces.append(index)
+            continue
+        member = labels == index
+        bounds = [left] + [left + cut for cut in torso_cuts(member[top:bottom, left:right])] + [right]
+        for x0, x1 in zip(bounds, bounds[1:]):
+            part = np.zeros_like(member)
+            part[:, x0:x1] = member[:, x0:x1]
+            poses.append(part)
+
+    def cell_box(mask):
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+    pose_boxes = [cell_box(pose) for pose in poses]
+    for index in pieces:
+        piece = components[index]
+        nearest = min(range(len(poses)), key=lambda i: box_gap(piece, pose_boxes[i]))
+        if box_gap(piece, pose_boxes[nearest]) <= attach_gap:
+            poses[nearest] |= labels == index
+
+    frames = []
+    for pose in poses:
+        left, top, right, bottom = cell_box(pose)
+        x0, y0 = left * cell, top * cell
+        x1, y1 = min(right * cell, alpha.shape[1]), min(bottom * cell, alpha.shape[0])
+        member = np.repeat(np.repeat(pose[top:bottom, left:right], cell, axis=0), cell, axis=1)[:y1 - y0, :x1 - x0]
+        # Tighten the cell-aligned box to exact pixel bounds
+        bounds = alpha_bounds(np.where(member, alpha[y0:y1, x0:x1], 0))
+        if bounds is not None:
+            box = (x0 + bounds[0], y0 + bounds[1], x0 + bounds[2], y0 + bounds[3])
+            frames.append(box + (member[bounds[1]:bounds[3], bounds[0]:bounds[2]],))
+
+    return [(box[:4], box[4]) for box in reading_order(frames)]
+
+def slice_sheet(sheet_path, tolerance=BACKGROUND_TOLERANCE):
+    """
+    Cut one sheet into RGBA frames.
+    Returns a list of (box, frame image) in reading order.
+    """
+    image = Image.open(sheet_path)
+    alpha = foreground_alpha(image, tolerance)
+    rgb = np.asarray(image.convert('RGB'))
+
+    frames = []
+    for box, member in find_frames(alpha):
+        left, top, right, bottom = box
+        frame_alpha = np.where(member, alpha[top:bottom, left:right], 0).astype(np.uint8)
+        rgba = np.dstack([rgb[top:bottom, left:right], frame_alpha])
+        frames.append((box, Image.fromarray(rgba, 'RGBA')))
+    return frames
+
+def frame_names(sheet_name, count, name_map):
+    """
+    Pose names for a sheet's frames from the name map; unnamed frames get
+    <sheet>_<index> and frames mapped to null are skipped.
+    """
+    names = name_map.get(sheet_name, [])
+    stem = os.path.splitext(sheet_name)[0]
+    result = []
+    for index in range(count):
+        if index < len(names):
+            result.append(names[index])
+        else:
+            result.append(f"{stem}_{index:02d}")
+    return result
+
+def process_sheet(sheet_path, char_name, profile, reference_heights, output_dir, name_map, tolerance,
+                  encode=DEFAULT_ENCODE):
+    """
+    Slice one sheet and normalize every named frame with the profile.
+    Returns (metadata by pose, log lines). Runs in a worker process with --jobs.
+    """
+    sheet_name = os.path.basename(sheet_path)
+    log = [f"\n  {sheet_name}:"]
+    metadata = {}
+
+    try:
+        frames = slice_sheet(sheet_path, tolerance)
+    except Exception as e:
+        log.append(f"    Error: {e}")
+        return metadata, log
+
+    for (box, frame), name in zip(frames, frame_names(sheet_name, len(frames), name_map)):
+        if name is None:
+            continue
+        filename = f"{name}.png"
+        params = profile_params(profile, char_name, filename, reference_heights, encode)
+        output_path = os.path.join(output_dir, encoded_filename(filename, encode))
+
+        # Hand the in-memory frame to the pipeline as an already-decoded source
+        decoded = (frame, alpha_bounds(np.asarray(frame.getchannel('A'))))
+        [(_, sprite_metadata, sprite_log)] = process_source(
+            os.path.join(os.path.dirname(sheet_path), filename),
+            [(profile['name'], profile['mode'], output_path, params)], decoded)
+
+        log.append(f"    {name}: {box[2] - box[0]}x{box[3] - box[1]} at ({box[0]}, {box[1]})")
+        log.extend(sprite_log)
+        if sprite_metadata is not None:
+            sprite_metadata['sheet'] = sheet_name
+            sprite_metadata['sheet_box'] = list(box)
+            metadata[name] = sprite_metadata
+
+    return metadata, log
+
+def main():
+    """Slice every raw spritesheet and normalize the frames."""
+    profile_names = [profile['name'] for profile in PROFILES]
+
+    parser = argparse.ArgumentParser(description="Slice Gemini spritesheets into normalized poses")
+    parser.add_argument('sheets', nargs='*',
+                        help="sheet PNGs to slice (default: every sheet in the known sheet dirs)")
+    parser.add_argument('--character', choices=[name for name, _ in CHARACTERS],
+                        help="character the given sheets belong to")
+    parser.add_argument('--names', help="JSON file mapping sheet filename -> list of pose names (null skips a frame)")
+    parser.add_argument('--profile', default='cross', choices=profile_names,
+                        help="pipeline profile used to normalize frames (default: cross)")
+    parser.add_argument('--output', help="output dir, with a subdirectory per character when slicing more "
+                                         "than one (default: <profile output dir>_sliced)")
+    parser.add_argument('--tolerance', type=int, default=BACKGROUND_TOLERANCE,
+                        help=f"background colour tolerance for opaque sheets (default: {BACKGROUND_TOLERANCE})")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="worker processes, one sheet each (0 = one per CPU, default: 1)")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"output encoding (default: {DEFAULT_ENCODE})")
+    args = parser.parse_args()
+    jobs = args.jobs or os.cpu_count() or 1
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    profile = next(p for p in PROFILES if p['name'] == args.profile)
+
+    name_map = {}
+    if args.names:
+        with open(args.names) as f:
+            name_map = json.load(f)
+
+    if args.sheets:
+        if not args.character:
+            parser.error("--character is required when sheets are given")
+        groups = [(args.character, list(args.sheets))]
+    else:
+        groups = []
+        for char_name, sheet_dir in SHEETS:
+            sheet_path = os.path.join(base_dir, sheet_dir)
+            if os.path.exists(sheet_path):
+                groups.append((char_name, [os.path.join(sheet_path, f) for f in sorted(os.listdir(sheet_path))
+                                           if f.lower().endswith('.png')]))
+
+    print("Spritesheet Slicer")
+    print("=" * 50)
+
+    # Reference heights come from each character's standing source sprite
+    reference_heights = {}
+    for char_name, input_dir in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        reference = find_reference(input_path) if os.path.exists(input_path) else None
+        if reference:
+            image, bounds = load_source(os.path.join(input_path, reference))
+            reference_heights[char_name] = bounds[3] - bounds[1] if bounds else image.height
+
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        for char_name, sheets in groups:
+            if args.output:
+                # Each character writes its own metadata file, so they can't share a directory
+                output_dir = os.path.join(args.output, char_name) if len(groups) > 1 else args.output
+            else:
+                output_dir = os.path.join(base_dir, profile['outputs'][char_name] + '_sliced')
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"\nSlicing {char_name} sheets into {output_dir}...")
+
+            sheet_args = [(sheet, char_name, profile, reference_heights, output_dir, name_map, args.tolerance,
+                           args.encode) for sheet in sheets]
+            if executor is None:
+                results = (process_sheet(*a) for a in sheet_args)
+            else:
+                results = executor.map(process_sheet, *zip(*sheet_args)) if sheet_args else []
+
+            metadata = {}
+            for sheet_metadata, log in results:
+                print("\n".join(log))
+                metadata.update(sheet_metadata)
+
+            with open(os.path.join(output_dir, profile['metadata_file']), 'w') as f:
+                json.dump(metadata, f, indent=2)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    print("\n" + "=" * 50)
+    print("Slicing complete!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Sprite Build Cache - Persistent manifest that lets the normalizers skip sprites
+whose source pixels and build parameters have not changed since the last run.
+"""
+
+import os
+import json
+import hashlib
+
+MANIFEST_NAME = '.build_manifest.json'
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def build_key(source_hash, params):
+    """Combine a source hash and the build parameters into one cache key."""
+    payload = json.dumps({'source': source_hash, 'params': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BuildCache:
+    """
+    Build manifest stored alongside the outputs of one normalizer run.
+    Each entry is keyed by output filename and records the cache key it was
+    built from, the metadata it produced and the stat of the written file.
+    With force=True the old manifest is ignored but a fresh one is still written.
+    """
+
+    def __init__(self, output_dir, enabled=True, force=False):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.enabled = enabled
+        self.entries = {}
+        self.sources = {}
+        self.values = {}
+
+        if enabled and not force and os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    manifest = json.load(f)
+                self.entries = manifest.get('entries', {})
+                self.sources = manifest.get('sources', {})
+                self.values = manifest.get('values', {})
+            except (OSError, ValueError):
+                # A corrupt manifest just means a full rebuild
+                self.entries = {}
+                self.sources = {}
+                self.values = {}
+
+    def source_hash(self, source_path):
+        """
+        Hash a source file, reusing the previous hash when its size and
+        mtime are unchanged so untouched sprites are never read.
+        """
+        stat = os.stat(source_path)
+        name = os.path.basename(source_path)
+        known = self.sources.get(name)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['sha256']
+
+        digest = file_hash(source_path)
+        self.sources[name] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        return digest
+
+    def key_for(self, source_path, params):
+        """Cache key for building source_path with the given parameters."""
+        return build_key(self.source_hash(source_path), params)
+
+    def lookup(self, filename, key, output_name=None):
+        """
+        Return the cached metadata for filename if it was built from the same
+        key and its output (output_name, default filename) is still on disk
+        untouched, otherwise None.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self.entries.get(filename)
+        output_path = os.path.join(self.output_dir, output_name or filename)
+        if entry is None or entry['key'] != key or not os.path.exists(output_path):
+            return None
+
+        stat = os.stat(output_path)
+        if stat.st_size != entry['output_size'] or stat.st_mtime_ns != entry['output_mtime_ns']:
+            # Output was edited or replaced after the build (e.g. by hand)
+            return None
+
+        return entry['metadata']
+
+    def store(self, filename, key, metadata, output_name=None):
+        """Record a freshly built output."""
+        output_path = os.path.join(self.output_dir, output_name or filename)
+        stat = os.stat(output_path)
+        self.entries[filename] = {
+            'key': key,
+            'metadata': metadata,
+            'output_size': stat.st_size,
+            'output_mtime_ns': stat.st_mtime_ns
+        }
+
+    def recall(self, name, key):
+        """Return a derived value (e.g. a reference height) cached under key, or None."""
+        if not self.enabled:
+            return None
+        entry = self.values.get(name)
+        if entry is None or entry['key'] != key:
+            return None
+        return entry['value']
+
+    def remember(self, name, key, value):
+        """Cache a derived value so the next run can skip decoding its source."""
+        self.values[name] = {'key': key, 'value': value}
+
+    def prune(self, filenames):
+        """Forget entries for sprites that no longer exist in the source directory."""
+        keep = set(filenames)
+        self.entries = {name: entry for name, entry in self.entries.items() if name in keep}
+        self.sources = {name: entry for name, entry in self.sources.items() if name in keep}
+
+    def save(self):
+        """Write the manifest back to the output directory."""
+        if not self.enabled:
+            return
+        with open(self.path, 'w') as f:
+            json.dump({'entries': self.entries, 'sources': self.sources, 'values': self.values}, f, indent=2)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Sprite Duplicate Finder
+Finds exact duplicates (same decoded pixels, whatever the file encoding) and
+near-duplicates (perceptual difference hash within a few bits) among sprite
+images. pack_atlas.py and hash_assets.py use it to ship each unique payload
+once; run directly it reports the redundant files in the working tree.
+"""
+
+import os
+import json
+import hashlib
+import argparse
+from PIL import Image
+import numpy as np
+
+HASH_SIZE = 16       # Difference hash of HASH_SIZE x HASH_SIZE bits
+NEAR_DISTANCE = 12   # Differing hash bits (of 256) still counted as a near-duplicate
+ASPECT_TOLERANCE = 0.05  # Content boxes must have nearly the same shape to be near-duplicates
+
+# Where sprites live (searched recursively)
+DEFAULT_TARGETS = ['elon', 'trump1', 'trump1_normalized', 'trump1_normalized_v2', 'trump1_normalized_v3', 'atlas']
+
+REPORT_FILE = 'duplicate_report.json'
+
+def pixel_digest(image):
+    """SHA-256 of an image's size and RGBA pixels, so re-encoded copies still match."""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    digest = hashlib.sha256(f"{image.width}x{image.height}".encode('ascii'))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+def content_box(image):
+    """Bounding box of the non-transparent pixels (the whole image if there are none)."""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    return image.getchannel('A').getbbox() or (0, 0, image.width, image.height)
+
+def thumbnail(image, hash_size=HASH_SIZE):
+    """
+    Alpha-weighted luminance of the content box at (hash_size + 1) x hash_size,
+    as float32. Cropping first keeps padding from swamping the pose and makes
+    rescaled copies hash alike.
+    """
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    small = np.asarray(image.crop(content_box(image)).resize((hash_size + 1, hash_size), Image.Resampling.BOX,
+                                                             reducing_gap=2.0),
+                       dtype=np.float32)
+    # Transparent pixels count as black, so the silhouette drives the hash
+    return (small[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)) * small[..., 3] / 255
+
+def perceptual_hashes(images, hash_size=HASH_SIZE):
+    """
+    Difference hashes for many images at once: each bit says whether a
+    thumbnail pixel is brighter than its left neighbour.
+    Returns an (N, hash_size * hash_size / 8) uint8 array.
+    """
+    stack = np.stack([thumbnail(image, hash_size) for image in images])
+    bits = stack[:, :, 1:] > stack[:, :, :-1]
+    return np.packbits(bits.reshape(len(images), -1), axis=1)
+
+def aspect_ratios(images):
+    """Width / height of each image's content box."""
+    ratios = []
+    for image in images:
+        left, top, right, bottom = content_box(image)
+        ratios.append((right - left) / max(bottom - top, 1))
+    return np.array(ratios)
+
+def hamming_matrix(hashes):
+    """Pairwise differing bits between all hashes, as an (N, N) array."""
+    return np.unpackbits(hashes[:, None, :] ^ hashes[None, :, :], axis=2).sum(axis=2)
+
+def find_duplicates(images, near_distance=NEAR_DISTANCE):
+    """
+    Group images (a dict of name -> image) into duplicates.
+    Returns (exact, near): exact is a list of name groups with identical pixels,
+    canonical (first by name) first; near is a list of (name, name, distance)
+    for different images whose hashes are within near_distance bits.
+    """
+    names = sorted(images)
+    groups = {}
+    for name in names:
+        groups.setdefault(pixel_digest(images[name]), []).append(name)
+    exact = [group for group in groups.values() if len(group) > 1]
+
+    # Compare one representative per distinct payload
+    representatives = [group[0] for group in groups.values()]
+    near = []
+    if len(representatives) > 1:
+        candidates = [images[name] for name in representatives]
+        distances = hamming_matrix(perceptual_hashes(candidates))
+        ratios = aspect_ratios(candidates)
+        same_shape = np.abs(np.log(ratios[:, None] / ratios[None, :])) <= ASPECT_TOLERANCE
+        rows, cols = np.nonzero(np.triu((distances <= near_distance) & same_shape, k=1))
+        near = sorted((representatives[i], representatives[j], int(distances[i, j])) for i, j in zip(rows, cols))
+    return exact, near
+
+def alias_map(images, near_distance=None):
+    """
+    {alias: canonical} for images that can be drawn from another one's pixels.
+    Exact duplicates always alias; with near_distance, near-duplicates within
+    that many hash bits alias too (lossy, so opt-in).
+    """
+    exact, near = find_duplicates(images, near_distance if near_distance is not None else -1)
+    aliases = {name: group[0] for group in exact for name in group[1:]}
+    for first, second, _ in near:
+        canonical = aliases.get(first, first)
+        if second not in aliases and second != canonical:
+            aliases[second] = canonical
+    return aliases
+
+def list_images(base_dir, targets):
+    """Repo-relative paths of every PNG/WebP under the targets."""
+    paths = []
+    for target in targets:
+        root = os.path.join(base_dir, target)
+        if os.path.isfile(root):
+            paths.append(target)
+            continue
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                if filename.lower().endswith(('.png', '.webp')):
+                    paths.append(os.path.relpath(os.path.join(directory, filename), base_dir))
+    return sorted(paths)
+
+def main():
+    """Report duplicate and near-duplicate sprites in the working tree."""
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate sprite images")
+    parser.add_argument('targets', nargs='*', help="files or directories to scan (default: sprite directories)")
+    parser.add_argument('--near', type=int, default=NEAR_DISTANCE,
+                        help=f"hash bits that may differ for a near-duplicate (default: {NEAR_DISTANCE})")
+    parser.add_argument('--output', default=REPORT_FILE, help=f"JSON report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    paths = list_images(base_dir, args.targets or DEFAULT_TARGETS)
+
+    print("Sprite Duplicate Finder")
+    print("=" * 50)
+    print(f"Scanning {len(paths)} image(s)")
+
+    images = {path: Image.open(os.path.join(base_dir, path)) for path in paths}
+    exact, near = find_duplicates(images, args.near)
+    sizes = {path: os.path.getsize(os.path.join(base_dir, path)) for path in paths}
+
+    redundant = sum(sizes[path] for group in exact for path in group[1:])
+    print(f"\n  Exact duplicates: {len(exact)} group(s), {redundant / (1024 * 1024):.1f} MB redundant")
+    for group in exact:
+        print(f"    {group[0]}")
+        for path in group[1:]:
+            print(f"      = {path} ({sizes[path] / 1024:.0f} KB)")
+
+    print(f"\n  Near duplicates (<= {args.near} bits): {len(near)} pair(s)")
+    for first, second, distance in near:
+        print(f"    {first} ~ {second} ({distance} bits)")
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            'exact': [{'canonical': group[0], 'duplicates': group[1:]} for group in exact],
+            'near': [{'a': first, 'b': second, 'distance': distance} for first, second, distance in near],
+            'redundant_bytes': redundant
+        }, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Animation Delta Encoder
+Groups the frames of multi-frame animations (walk cycles) and diffs each
+frame against its sequence's key frame with NumPy, reducing the changed
+pixels to a few non-overlapping rectangles. pack_atlas.py --delta packs the
+key frame whole and only those rectangles (patches) of the other frames; run
+directly it reports what each sequence would save.
+"""
+
+import io
+import os
+import re
+import json
+import argparse
+from PIL import Image
+import numpy as np
+from sprite_pipeline import ENCODE_PROFILES, DEFAULT_ENCODE, encode_image, pose_files
+
+TILE_SIZE = 32      # Changed pixels are grouped into TILE_SIZE x TILE_SIZE tiles before merging into rects
+PATCH_BLEED = 1     # Patches overlap their region by this many pixels so scaled draws don't leave seams
+MIN_SAVINGS = 0.1   # A frame is only delta-encoded when its patches encode this much smaller than the whole frame
+
+# Sequences that the numbered-frame rule (walking1, walking2, ...) can't find, key frame first
+SEQUENCES = {
+    'trump': {'walk': ['standing', 'walking-forward']}  # SpriteManager alternates walk/walk2 between these
+}
+
+# Normalized poses to report on when run directly: (name, directory)
+DEFAULT_CHARACTERS = [
+    ('elon', 'elon/Elon1_normalized_v3'),
+    ('trump', 'trump1_normalized_v3')
+]
+
+REPORT_FILE = 'delta_report.json'
+
+def find_sequences(char_name, poses):
+    """
+    {sequence: [frame, ...]} for one character's poses, key frame first.
+    Numbered poses sharing a prefix (walking1, walking2, walking3) form a
+    sequence, plus any SEQUENCES entry whose frames all exist.
+    """
+    numbered = {}
+    for pose in poses:
+        match = re.fullmatch(r'(.*?)-?(\d+)', pose)
+        if match:
+            numbered.setdefault(match.group(1), []).append((int(match.group(2)), pose))
+    sequences = {prefix: [pose for _, pose in sorted(frames)] for prefix, frames in numbered.items()
+                 if len(frames) > 1}
+    for name, frames in SEQUENCES.get(char_name, {}).items():
+        if all(frame in poses for frame in frames):
+            sequences[name] = list(frames)
+    return dict(sorted(sequences.items()))
+
+def rgba_array(image):
+    """An image's pixels as an (H, W, 4) uint8 array."""
+    return np.asarray(image if image.mode == 'RGBA' else image.convert('RGBA'))
+
+def changed_rects(mask, tile=TILE_SIZE):
+    """
+    Cover the True pixels of a 2-D mask with non-overlapping rectangles.
+    Changed tiles are merged into horizontal runs, runs with the same columns
+    in consecutive tile rows become one rect, and each rect is tightened to
+    the changed pixels inside it. Returns (left, top, right, bottom) boxes.
+    """
+    height, width = mask.shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=bool)
+    padded[:height, :width] = mask
+    tiles = padded.reshape(rows, tile, cols, tile).any(axis=(1, 3))
+
+    tile_rects = []
+    open_runs = {}  # (first col, end col) -> first tile row
+    for row in range(rows + 1):
+        runs = set()
+        if row < rows:
+            edges = np.flatnonzero(np.diff(np.concatenate(([0], tiles[row].astype(np.int8), [0]))))
+            runs = set(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+        for run in [run for run in open_runs if run not in runs]:
+            tile_rects.append((run, open_runs.pop(run), row))
+        for run in runs:
+            open_runs.setdefault(run, row)
+
+    boxes = []
+    for (first, end), top, bottom in tile_rects:
+        x0, y0 = first * tile, top * tile
+        ys, xs = np.nonzero(mask[y0:min(bottom * tile, height), x0:min(end * tile, width)])
+        boxes.append((x0 + int(xs.min()), y0 + int(ys.min()), x0 + int(xs.max()) + 1, y0 + int(ys.max()) + 1))
+    return sorted(boxes, key=lambda box: (box[1], box[0]))
+
+def encode_delta(key, frame, tile=TILE_SIZE, bleed=PATCH_BLEED):
+    """
+    Diff frame against key (same-size canvases).
+    Returns (regions, patches): regions are the boxes whose pixels the frame
+    replaces; patches are (image, x, y) crops of the frame covering them, grown
+    by bleed and trimmed to their visible pixels (a region that only turns
+    transparent needs no patch). None when the canvases differ in size.
+    """
+    if key.size != frame.size:
+        return None
+    frame = frame if frame.mode == 'RGBA' else frame.convert('RGBA')
+    regions = changed_rects((rgba_array(key) != rgba_array(frame)).any(axis=2), tile)
+
+    patches = []
+    for left, top, right, bottom in regions:
+        grown = (max(left - bleed, 0), max(top - bleed, 0),
+                 min(right + bleed, frame.width), min(bottom + bleed, frame.height))
+        crop = frame.crop(grown)
+        bounds = crop.getchannel('A').getbbox()
+        if bounds is not None:
+            patches.append((crop.crop(bounds), grown[0] + bounds[0], grown[1] + bounds[1]))
+    return regions, patches
+
+def encoded_size(image, encode=DEFAULT_ENCODE):
+    """Bytes of an image encoded with an encode profile."""
+    buffer = io.BytesIO()
+    encode_image(image, buffer, encode)
+    return buffer.tell()
+
+def plan_deltas(char_name, poses, min_savings=MIN_SAVINGS, exclude=(), encode=DEFAULT_ENCODE):
+    """
+    Decide which frames to delta-encode for one character.
+    Returns (deltas, report): deltas maps frame -> key frame for every frame
+    whose patches encode at least min_savings smaller than the trimmed frame
+    (pixel area alone flatters patches: the transparent margin they skip
+    compresses to almost nothing); report holds per-sequence bytes and pixels
+    for all candidate frames. Poses in exclude (e.g. aliases) take no part.
+    """
+    deltas = {}
+    report = {}
+    available = {pose: image for pose, image in poses.items() if pose not in exclude}
+    for name, frames in find_sequences(char_name, available).items():
+        key = frames[0]
+        if key in deltas:
+            continue  # Already encoded against another sequence's key
+        entry = report[name] = {'key': key, 'frames': {}, 'full_bytes': 0, 'packed_bytes': 0}
+        for frame in frames[1:]:
+            if frame in deltas:
+                continue
+            image = available[frame] if available[frame].mode == 'RGBA' else available[frame].convert('RGBA')
+            whole = image.crop(image.getchannel('A').getbbox() or (0, 0, 1, 1))
+            stats = {'full_bytes': encoded_size(whole, encode), 'full_pixels': whole.width * whole.height,
+                     'regions': 0, 'patch_bytes': None, 'patch_pixels': None, 'delta': False}
+            encoded = encode_delta(available[key], image)
+            if encoded is not None:
+                regions, patches = encoded
+                stats.update({
+                    'regions': len(regions),
+                    'patch_bytes': sum(encoded_size(patch, encode) for patch, _, _ in patches),
+                    'patch_pixels': sum(patch.width * patch.height for patch, _, _ in patches)
+                })
+                stats['delta'] = stats['patch_bytes'] <= stats['full_bytes'] * (1 - min_savings)
+            if stats['delta']:
+                deltas[frame] = key
+            entry['frames'][frame] = stats
+            entry['full_bytes'] += stats['full_bytes']
+            entry['packed_bytes'] += stats['patch_bytes'] if stats['delta'] else stats['full_bytes']
+    return deltas, report
+
+def print_report(char_name, report):
+    """Print what delta encoding saves per sequence."""
+    for name, entry in report.items():
+        saved = entry['full_bytes'] - entry['packed_bytes']
+        print(f"  {char_name} {name} (key {entry['key']}): {entry['full_bytes'] / 1024:.0f} KB -> "
+              f"{entry['packed_bytes'] / 1024:.0f} KB ({100 * saved / max(entry['full_bytes'], 1):.0f}% saved)")
+        for frame, stats in entry['frames'].items():
+            if stats['patch_bytes'] is None:
+                print(f"    {frame}: canvas differs from {entry['key']} - kept whole")
+                continue
+            note = "delta" if stats['delta'] else "kept whole"
+            print(f"    {frame}: {stats['regions']} region(s), patches {stats['patch_bytes'] / 1024:.0f} KB "
+                  f"({stats['patch_pixels'] / 1e3:.0f}K pixels) vs whole {stats['full_bytes'] / 1024:.0f} KB "
+                  f"({stats['full_pixels'] / 1e3:.0f}K pixels) - {note}")
+
+def main():
+    """Report the delta-encoding savings of each animation sequence."""
+    parser = argparse.ArgumentParser(description="Report delta-encoding savings for animation sequences")
+    parser.add_argument('--min-savings', type=float, default=MIN_SAVINGS,
+                        help=f"fraction of a frame's encoded bytes patches must save to be used (default: {MIN_SAVINGS})")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"encoding the sizes are measured with (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--output', default=REPORT_FILE, help=f"JSON report path (default: {REPORT_FILE})")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print("Animation Delta Encoder")
+    print("=" * 50)
+
+    reports = {}
+    for char_name, input_dir in DEFAULT_CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if not os.path.exists(input_path):
+            print(f"\nSkipping {char_name}: Directory not found")
+            continue
+        poses = {name: Image.open(os.path.join(input_path, filename))
+                 for name, filename in pose_files(input_path).items()}
+        _, reports[char_name] = plan_deltas(char_name, poses, args.min_savings, encode=args.encode)
+        print_report(char_name, reports[char_name])
+
+    with open(args.output, 'w') as f:
+        json.dump(reports, f, indent=2)
+
+    print("\n" + "=" * 50)
+    print(f"Report saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
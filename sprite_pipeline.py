@@ -0,0 +1,637 @@
+#!/usr/bin/env python3
+"""
+Unified Sprite Pipeline
+Decodes every source sprite once and writes all configured output profiles from
+that single RGBA buffer: crop-only (v1), normalized per character (v2) and
+cross-character (v3), including per-sprite scale overrides such as Elon's throw.
+Outputs can be encoded as default PNG, max-effort PNG, palette PNG or WebP,
+and downscaled with plain LANCZOS or a faster box-reduce-then-LANCZOS strategy.
+"""
+
+import io
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, features
+import numpy as np
+from sprite_cache import BuildCache
+from sprite_trace import Tracer, NULL_TRACER
+
+# Pose-specific scale multipliers; the first matching rule wins
+POSE_SCALE_RULES = [
+    (('crouch', 'thrown'), 0.7),  # These sprites should be shorter
+    (('jump',), 0.9)
+]
+
+# Canvas size relative to the reference height
+CANVAS_WIDTH_RATIO = 1.5   # Wide enough for kicks
+CANVAS_HEIGHT_RATIO = 1.2  # Tall enough for jumps
+
+ALPHA_THRESHOLD = 10  # Ignore very faint pixels when finding content bounds
+
+# Bump when a profile's output changes for the same inputs
+BUILD_VERSION = 1
+
+# Source sprites: (character, source dir)
+CHARACTERS = [
+    ('elon', 'elon/Elon1'),
+    ('trump', 'trump1')
+]
+
+# Output profiles produced from every decoded source.
+#   mode       - crop, character or cross (see RENDERERS)
+#   reference  - character whose standing height sets the scale (None = each character's own)
+#   outputs    - output dir per character
+#   overrides  - extra scale per character and sprite, applied before the canvas paste
+PROFILES = [
+    {
+        'name': 'crop',
+        'mode': 'crop',
+        'outputs': {'elon': 'elon/Elon1_normalized', 'trump': 'trump1_normalized'},
+        'metadata_file': 'sprite_metadata.json'
+    },
+    {
+        'name': 'character',
+        'mode': 'character',
+        'reference': None,
+        'outputs': {'elon': 'elon/Elon1_normalized_v2', 'trump': 'trump1_normalized_v2'},
+        'metadata_file': 'sprite_metadata.json'
+    },
+    {
+        'name': 'cross',
+        'mode': 'cross',
+        'reference': 'elon',
+        'outputs': {'elon': 'elon/Elon1_normalized_v3', 'trump': 'trump1_normalized_v3'},
+        'metadata_file': 'metadata.json',
+        'overrides': {'elon': {'throw': 0.8}}  # Replaces scale_throw_sprite.py
+    }
+]
+
+# Output encodings; 'png' keeps Pillow's default settings (the historic output)
+#   format  - file format, also used as the file extension
+#   colors  - palette-quantize to this many colours first, alpha included
+#   options - Pillow save() options
+ENCODE_PROFILES = {
+    'png': {'format': 'png', 'options': {}},
+    'png-max': {'format': 'png', 'options': {'optimize': True}},  # zlib level 9 + filter search
+    'png8': {'format': 'png', 'colors': 256, 'options': {'optimize': True}},
+    'webp-lossless': {'format': 'webp', 'options': {'lossless': True, 'quality': 100, 'method': 6}},
+    'webp': {'format': 'webp', 'options': {'quality': 90, 'alpha_quality': 100, 'method': 6}}
+}
+DEFAULT_ENCODE = 'png'
+
+# Downscale strategies; 'lanczos' resamples straight from the source (the historic output)
+#   reducing_gap - box-reduce by an integer factor first, leaving at least this
+#                  ratio for the final LANCZOS pass (Pillow's reduce + resize)
+# resample_report.py measures each one's speed and PSNR/SSIM against 'lanczos'
+RESAMPLE_PROFILES = {
+    'lanczos': {'reducing_gap': None},
+    'reduce3': {'reducing_gap': 3.0},
+    'reduce2': {'reducing_gap': 2.0},
+    'reduce1': {'reducing_gap': 1.0}  # Box-reduce right down to the target, then a short LANCZOS pass
+}
+DEFAULT_RESAMPLE = 'lanczos'
+
+BOUNDS_STRIP_HEIGHT = 64  # Rows scanned at a time when looking for the top/bottom edges
+
+def alpha_band(image):
+    """
+    Return the image's alpha channel as a 2-D uint8 array, or None if the
+    image has no transparency (every pixel then counts as content).
+    Only the alpha band is copied out, never a full RGBA array.
+    """
+    if image.mode in ('RGBA', 'LA', 'PA', 'RGBa', 'La'):
+        band = image.getchannel('A')
+    elif 'transparency' in image.info:
+        # Palette or colour-key transparency has to be expanded first
+        band = image.convert('RGBA').getchannel('A')
+    else:
+        return None
+    return np.asarray(band)
+
+def alpha_bounds(alpha, threshold=ALPHA_THRESHOLD, strip_height=BOUNDS_STRIP_HEIGHT):
+    """
+    Bounding box (left, top, right, bottom) of pixels with alpha > threshold
+    in a 2-D alpha array, or None if there are none.
+    The top and bottom edges are found by scanning horizontal strips inwards
+    and stopping at the first strip with content, so large transparent
+    margins are barely touched; columns are then reduced over the rows in between.
+    """
+    height = alpha.shape[0]
+
+    top = None
+    for y in range(0, height, strip_height):
+        rows = alpha[y:y + strip_height].max(axis=1) > threshold
+        if rows.any():
+            top = y + int(rows.argmax())
+            break
+
+    if top is None:
+        # Image is fully transparent
+        return None
+
+    bottom = top + 1
+    for y in range(height, top, -strip_height):
+        start = max(y - strip_height, top)
+        rows = alpha[start:y].max(axis=1) > threshold
+        if rows.any():
+            bottom = start + len(rows) - int(rows[::-1].argmax())
+            break
+
+    cols = alpha[top:bottom].max(axis=0) > threshold
+    left = int(cols.argmax())
+    right = len(cols) - int(cols[::-1].argmax())
+
+    return (left, top, right, bottom)
+
+def batch_alpha_bounds(alphas, threshold=ALPHA_THRESHOLD):
+    """
+    Bounds for many same-size frames at once.
+    alphas is an (N, H, W) uint8 array of alpha channels stacked together.
+    Returns a list of N (left, top, right, bottom) tuples, None for empty frames.
+    """
+    rows = alphas.max(axis=2) > threshold  # (N, H)
+    cols = alphas.max(axis=1) > threshold  # (N, W)
+
+    has_content = rows.any(axis=1)
+    tops = rows.argmax(axis=1)
+    bottoms = rows.shape[1] - rows[:, ::-1].argmax(axis=1)
+    lefts = cols.argmax(axis=1)
+    rights = cols.shape[1] - cols[:, ::-1].argmax(axis=1)
+
+    return [
+        (int(left), int(top), int(right), int(bottom)) if content else None
+        for left, top, right, bottom, content in zip(lefts, tops, rights, bottoms, has_content)
+    ]
+
+def find_content_bounds(image):
+    """Find the bounding box of non-transparent pixels (alpha > 10)."""
+    alpha = alpha_band(image)
+    if alpha is None:
+        # No alpha channel - the whole image is opaque content
+        return (0, 0, image.width, image.height)
+    return alpha_bounds(alpha)
+
+def pose_scale(filename, rules=POSE_SCALE_RULES):
+    """Extra scale for a pose from the first matching rule, or 1.0."""
+    for keywords, scale in rules:
+        if any(keyword in filename.lower() for keyword in keywords):
+            return scale
+    return 1.0
+
+def load_source(path, tracer=NULL_TRACER):
+    """Decode a source sprite once into an RGBA buffer and find its content bounds."""
+    with tracer.span('decode'):
+        image = Image.open(path)
+        image.load()
+    if image.mode != 'RGBA':
+        with tracer.span('convert'):
+            image = image.convert('RGBA')
+    with tracer.span('bounds'):
+        bounds = find_content_bounds(image)
+    return image, bounds
+
+def encoded_filename(filename, encode=DEFAULT_ENCODE):
+    """Output filename for a sprite written with the given encode profile."""
+    return os.path.splitext(filename)[0] + '.' + ENCODE_PROFILES[encode]['format']
+
+def pose_files(output_dir, metadata_file='metadata.json'):
+    """
+    {pose: filename} of the sprites in an output dir, sorted by pose.
+    A pose listed in metadata_file uses the file its entry records (non-default
+    encodes) or its PNG, so outputs left over from a build in another encoding
+    are never picked up; unlisted poses use their PNG, else their WebP.
+    """
+    files = {}
+    for filename in sorted(os.listdir(output_dir), key=lambda f: not f.lower().endswith('.png')):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() in ('.png', '.webp'):
+            files.setdefault(name, filename)
+
+    metadata_path = os.path.join(output_dir, metadata_file)
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            for name, entry in json.load(f).items():
+                filename = entry.get('file', name + '.png')
+                if os.path.exists(os.path.join(output_dir, filename)):
+                    files[name] = filename
+    return dict(sorted(files.items()))
+
+def quantize_rgba(image, colors):
+    """Palette-quantize an RGBA image; the palette carries alpha so transparency is kept."""
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    method = Image.Quantize.LIBIMAGEQUANT if features.check('libimagequant') else Image.Quantize.FASTOCTREE
+    return image.quantize(colors=colors, method=method, dither=Image.Dither.FLOYDSTEINBERG)
+
+def encode_image(image, output, encode=DEFAULT_ENCODE):
+    """Save image to a path or file object using an encode profile."""
+    profile = ENCODE_PROFILES[encode]
+    if 'colors' in profile:
+        image = quantize_rgba(image, profile['colors'])
+    image.save(output, format=profile['format'].upper(), **profile['options'])
+
+def save_encoded(image, output_path, encode=DEFAULT_ENCODE, tracer=NULL_TRACER):
+    """Encode in memory, then write the file, so traces separate compression from disk time."""
+    buffer = io.BytesIO()
+    with tracer.span('encode'):
+        encode_image(image, buffer, encode)
+    with tracer.span('write'):
+        with open(output_path, 'wb') as f:
+            f.write(buffer.getbuffer())
+
+def resize_sprite(image, size, resample=DEFAULT_RESAMPLE):
+    """LANCZOS-resize to size, box-reducing first if the resample profile allows it."""
+    reducing_gap = RESAMPLE_PROFILES[resample]['reducing_gap']
+    if reducing_gap is None or image.mode != 'RGBA':
+        return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+    # Pillow ignores reducing_gap for RGBA, so premultiply here as its own RGBA path does
+    premultiplied = image.convert('RGBa').resize(size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+    return premultiplied.convert('RGBA')
+
+def render_crop(image, bounds, filename, params, tracer=NULL_TRACER):
+    """v1 profile: crop transparent padding, keep the original scale."""
+    original_width, original_height = image.size
+
+    if bounds is None:
+        return image, {
+            'original_width': original_width,
+            'original_height': original_height,
+            'crop_x': 0,
+            'crop_y': 0,
+            'crop_width': original_width,
+            'crop_height': original_height,
+            'center_offset_x': 0.0,
+            'center_offset_y': 0.0
+        }
+
+    crop_x, crop_y, crop_right, crop_bottom = bounds
+    crop_width = crop_right - crop_x
+    crop_height = crop_bottom - crop_y
+
+    # Offset of the cropped sprite's bottom-center from the original's
+    center_offset_x = (crop_x + crop_width / 2) - original_width / 2
+    center_offset_y = (crop_y + crop_height) - original_height
+
+    with tracer.span('crop'):
+        cropped = image.crop(bounds)
+
+    return cropped, {
+        'original_width': original_width,
+        'original_height': original_height,
+        'crop_x': crop_x,
+        'crop_y': crop_y,
+        'crop_width': crop_width,
+        'crop_height': crop_height,
+        'center_offset_x': float(center_offset_x),
+        'center_offset_y': float(center_offset_y)
+    }
+
+def render_on_canvas(image, bounds, filename, params, tracer=NULL_TRACER):
+    """
+    Scale the cropped sprite to the target height and paste it bottom-center
+    on the standard canvas. Returns (canvas, layout) or (image, None) if the
+    sprite has no visible content.
+    """
+    if bounds is None:
+        return image, None
+
+    crop_x, crop_y, crop_right, crop_bottom = bounds
+    crop_width = crop_right - crop_x
+    crop_height = crop_bottom - crop_y
+
+    scale_factor = params['target_height'] / crop_height
+    scale_factor *= pose_scale(filename, params['pose_scale_rules'])
+    scale_factor *= params['scale_override']
+
+    new_width = int(crop_width * scale_factor)
+    new_height = int(crop_height * scale_factor)
+
+    with tracer.span('crop'):
+        cropped = image.crop(bounds)
+    with tracer.span('resize'):
+        resized = resize_sprite(cropped, (new_width, new_height), params.get('resample', DEFAULT_RESAMPLE))
+
+    canvas_width = int(params['reference_height'] * params['canvas_ratio'][0])
+    canvas_height = int(params['reference_height'] * params['canvas_ratio'][1])
+
+    paste_x = (canvas_width - new_width) // 2
+    paste_y = canvas_height - new_height  # Align to bottom
+    with tracer.span('paste'):
+        canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
+        canvas.paste(resized, (paste_x, paste_y))
+
+    return canvas, {
+        'crop_x': crop_x,
+        'crop_y': crop_y,
+        'crop_width': crop_width,
+        'crop_height': crop_height,
+        'scale_factor': scale_factor,
+        'new_width': new_width,
+        'new_height': new_height,
+        'canvas_width': canvas_width,
+        'canvas_height': canvas_height,
+        'paste_x': paste_x,
+        'paste_y': paste_y
+    }
+
+def render_character(image, bounds, filename, params, tracer=NULL_TRACER):
+    """v2 profile: every pose scaled to the character's own standing height."""
+    canvas, layout = render_on_canvas(image, bounds, filename, params, tracer)
+    if layout is None:
+        return canvas, None
+
+    original_width, original_height = image.size
+    return canvas, {
+        'original_width': original_width,
+        'original_height': original_height,
+        'crop_x': layout['crop_x'],
+        'crop_y': layout['crop_y'],
+        'crop_width': layout['crop_width'],
+        'crop_height': layout['crop_height'],
+        'scale_factor': float(layout['scale_factor']),
+        'canvas_width': layout['canvas_width'],
+        'canvas_height': layout['canvas_height'],
+        'paste_x': layout['paste_x'],
+        'paste_y': layout['paste_y']
+    }
+
+def render_cross(image, bounds, filename, params, tracer=NULL_TRACER):
+    """v3 profile: every character scaled to the reference character's height."""
+    canvas, layout = render_on_canvas(image, bounds, filename, params, tracer)
+    if layout is None:
+        return canvas, None
+
+    original_width, original_height = image.size
+    metadata = {
+        'original_size': f"{original_width}x{original_height}",
+        'crop_size': f"{layout['crop_width']}x{layout['crop_height']}",
+        'final_size': f"{layout['new_width']}x{layout['new_height']}",
+        'scale_factor': round(layout['scale_factor'], 2),
+        'canvas_size': f"{layout['canvas_width']}x{layout['canvas_height']}"
+    }
+    if params['scale_override'] != 1.0:
+        metadata['scale_override'] = params['scale_override']
+    return canvas, metadata
+
+RENDERERS = {
+    'crop': render_crop,
+    'character': render_character,
+    'cross': render_cross
+}
+
+def profile_params(profile, char_name, filename, reference_heights, encode=DEFAULT_ENCODE,
+                   resample=DEFAULT_RESAMPLE):
+    """Everything besides the source pixels that affects one profile's output for one sprite."""
+    params = {
+        'version': BUILD_VERSION,
+        'mode': profile['mode'],
+        'alpha_threshold': ALPHA_THRESHOLD
+    }
+    if encode != DEFAULT_ENCODE:
+        # Only non-default encodes are keyed so existing PNG builds stay cached
+        params['encode'] = encode
+    if profile['mode'] == 'crop':
+        return params
+    if resample != DEFAULT_RESAMPLE:
+        params['resample'] = resample
+
+    reference = profile.get('reference') or char_name
+    params.update({
+        # Per-character heights use the character's own canvas, cross-character
+        # heights share the reference character's canvas
+        'target_height': reference_heights[reference],
+        'reference_height': reference_heights[reference],
+        'pose_scale_rules': POSE_SCALE_RULES,
+        'canvas_ratio': [CANVAS_WIDTH_RATIO, CANVAS_HEIGHT_RATIO],
+        'scale_override': profile.get('overrides', {}).get(char_name, {}).get(filename[:-4], 1.0)
+    })
+    return params
+
+def process_source(input_path, outputs, decoded=None, tracer=NULL_TRACER):
+    """
+    Decode one source sprite (unless already decoded) and write every
+    requested profile output from the same buffer.
+    outputs is a list of (profile name, mode, output path, params); the output
+    is encoded with params['encode'] (default PNG) and non-default encodes add
+    'format' and 'file' to the sprite's metadata.
+    Returns a list of (profile name, metadata or None, log lines).
+    Runs in a worker process when --jobs is used, so it only returns plain data.
+    """
+    filename = os.path.basename(input_path)
+
+    try:
+        image, bounds = decoded if decoded is not None else load_source(input_path, tracer)
+    except Exception as e:
+        return [(name, None, [f"    [{name}] Error: {e}"]) for name, _, _, _ in outputs]
+
+    results = []
+    for name, mode, output_path, params in outputs:
+        try:
+            output_img, metadata = RENDERERS[mode](image, bounds, filename, params, tracer)
+            encode = params.get('encode', DEFAULT_ENCODE)
+            save_encoded(output_img, output_path, encode, tracer)
+            if metadata is not None and encode != DEFAULT_ENCODE:
+                metadata = dict(metadata, format=ENCODE_PROFILES[encode]['format'],
+                                file=os.path.basename(output_path))
+            if metadata is None:
+                log = [f"    [{name}] Warning: No visible content found"]
+            elif mode == 'crop':
+                log = [f"    [{name}] {image.width}x{image.height} -> "
+                       f"{metadata['crop_width']}x{metadata['crop_height']}"]
+            else:
+                log = [f"    [{name}] {output_img.width}x{output_img.height} canvas "
+                       f"(scale: {metadata['scale_factor']:.2f})"]
+            results.append((name, metadata, log))
+        except Exception as e:
+            results.append((name, None, [f"    [{name}] Error: {e}"]))
+    return results
+
+def process_source_traced(input_path, outputs, decoded=None, trace=False):
+    """
+    process_source wrapped in a per-sprite span.
+    Returns (results, trace events) so worker processes can hand back their timings.
+    """
+    tracer = Tracer(enabled=trace)
+    with tracer.sprite(input_path):
+        results = process_source(input_path, outputs, decoded, tracer)
+    return results, tracer.events
+
+def find_reference(input_dir):
+    """The character's standing sprite, or the first sprite if there is none."""
+    filenames = sorted(f for f in os.listdir(input_dir) if f.lower().endswith('.png'))
+    if 'standing.png' in filenames:
+        return 'standing.png'
+    return filenames[0] if filenames else None
+
+def run_pipeline(base_dir, profiles, jobs=1, force=False, encode=DEFAULT_ENCODE, tracer=NULL_TRACER,
+                 resample=DEFAULT_RESAMPLE):
+    """
+    Run every profile over every character, decoding each source once.
+    With an enabled tracer every sprite's stages are recorded, workers included.
+    """
+    characters = []
+    for char_name, input_dir in CHARACTERS:
+        input_path = os.path.join(base_dir, input_dir)
+        if os.path.exists(input_path):
+            characters.append((char_name, input_path))
+        else:
+            print(f"\nSkipping {char_name}: Directory {input_path} not found")
+
+    caches = {}
+    for profile in profiles:
+        for char_name, _ in characters:
+            output_path = os.path.join(base_dir, profile['outputs'][char_name])
+            os.makedirs(output_path, exist_ok=True)
+            caches[(profile['name'], char_name)] = BuildCache(output_path, force=force)
+
+    # Reference heights; decoded references are kept so they aren't decoded again below
+    reference_heights = {}
+    decoded = {}
+    for char_name, input_path in characters:
+        reference = find_reference(input_path)
+        if reference is None:
+            continue
+        reference_path = os.path.join(input_path, reference)
+
+        # Remembered in the character's first output cache so unchanged references aren't decoded
+        cache = caches[(profiles[0]['name'], char_name)] if profiles else BuildCache(input_path, enabled=False)
+        reference_key = cache.key_for(reference_path, {'alpha_threshold': ALPHA_THRESHOLD})
+        height = cache.recall('reference_height', reference_key)
+        if height is None:
+            with tracer.sprite(reference_path):
+                decoded[reference_path] = load_source(reference_path, tracer)
+            image, bounds = decoded[reference_path]
+            height = bounds[3] - bounds[1] if bounds else image.height
+            cache.remember('reference_height', reference_key, height)
+        reference_heights[char_name] = height
+        print(f"Reference: {char_name} {reference} height = {height}px")
+
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+
+    try:
+        # Work out which profiles each source still needs and queue it
+        plan = []
+        for char_name, input_path in characters:
+            filenames = sorted(f for f in os.listdir(input_path) if f.lower().endswith('.png'))
+            for filename in filenames:
+                source_path = os.path.join(input_path, filename)
+                cached = {}
+                outputs = []
+                for profile in profiles:
+                    cache = caches[(profile['name'], char_name)]
+                    params = profile_params(profile, char_name, filename, reference_heights, encode, resample)
+                    key = cache.key_for(source_path, params)
+                    output_name = encoded_filename(filename, encode)
+                    metadata = cache.lookup(filename, key, output_name)
+                    if metadata is not None:
+                        cached[profile['name']] = (key, metadata)
+                    else:
+                        output_path = os.path.join(cache.output_dir, output_name)
+                        outputs.append((profile['name'], profile['mode'], output_path, params))
+
+                # Already-decoded references are finished inline from their buffer
+                task = None
+                if outputs and executor is not None and source_path not in decoded:
+                    task = executor.submit(process_source_traced, source_path, outputs, None, tracer.enabled)
+                plan.append((char_name, filename, source_path, cached, outputs, task))
+
+        metadata = {key: {} for key in caches}
+        for char_name, filename, source_path, cached, outputs, task in plan:
+            sprite_name = filename[:-4]
+            for name, (key, sprite_metadata) in cached.items():
+                metadata[(name, char_name)][sprite_name] = sprite_metadata
+            if not outputs:
+                continue
+
+            if task is None:
+                results, events = process_source_traced(source_path, outputs, decoded.pop(source_path, None),
+                                                        tracer.enabled)
+            else:
+                try:
+                    results, events = task.result()
+                except Exception as e:
+                    # The worker process itself failed (e.g. BrokenProcessPool)
+                    results = [(name, None, [f"    [{name}] Error: {e}"]) for name, _, _, _ in outputs]
+                    events = []
+            tracer.extend(events)
+
+            print(f"\n  {char_name}/{filename}:")
+            params_by_profile = {name: params for name, _, _, params in outputs}
+            for name, sprite_metadata, log in results:
+                print("\n".join(log))
+                if sprite_metadata is None:
+                    continue
+                cache = caches[(name, char_name)]
+                key = cache.key_for(source_path, params_by_profile[name])
+                cache.store(filename, key, sprite_metadata, encoded_filename(filename, encode))
+                metadata[(name, char_name)][sprite_name] = sprite_metadata
+
+        reused = sum(len(cached) for _, _, _, cached, _, _ in plan)
+        if reused:
+            print(f"\n  Reused {reused} unchanged output(s) from the build cache")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for profile in profiles:
+        for char_name, input_path in characters:
+            cache = caches[(profile['name'], char_name)]
+            cache.prune(sorted(f for f in os.listdir(input_path) if f.lower().endswith('.png')))
+            cache.save()
+            metadata_path = os.path.join(cache.output_dir, profile['metadata_file'])
+            with open(metadata_path, 'w') as f:
+                json.dump(metadata[(profile['name'], char_name)], f, indent=2)
+
+    return metadata
+
+def main():
+    """Run the configured output profiles over all character sprites."""
+    profile_names = [profile['name'] for profile in PROFILES]
+
+    parser = argparse.ArgumentParser(description="Build every sprite output profile from a single decode")
+    parser.add_argument('--profiles', default=','.join(profile_names),
+                        help=f"comma-separated profiles to build (default: {','.join(profile_names)})")
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help="worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore the build cache and rebuild every output")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"output encoding (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--resample', choices=sorted(RESAMPLE_PROFILES), default=DEFAULT_RESAMPLE,
+                        help=f"downscale strategy (default: {DEFAULT_RESAMPLE}; see resample_report.py)")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="write per-stage timings as a Chrome trace (open in ui.perfetto.dev)")
+    parser.add_argument('--trace-top', type=int, default=10,
+                        help="slowest sprites listed in the trace summary (default: 10)")
+    args = parser.parse_args()
+
+    selected = args.profiles.split(',')
+    unknown = [name for name in selected if name not in profile_names]
+    if unknown:
+        parser.error(f"unknown profile(s): {', '.join(unknown)}")
+    profiles = [profile for profile in PROFILES if profile['name'] in selected]
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    print("Unified Sprite Pipeline")
+    print("=" * 50)
+    print(f"Profiles: {', '.join(profile['name'] for profile in profiles)}")
+    print(f"Encoding: {args.encode}")
+    print(f"Resample: {args.resample}")
+
+    tracer = Tracer(enabled=bool(args.trace))
+    run_pipeline(base_dir, profiles, jobs=args.jobs or os.cpu_count() or 1,
+                 force=args.force, encode=args.encode, tracer=tracer, resample=args.resample)
+
+    if args.trace:
+        tracer.save(args.trace)
+        tracer.print_summary(args.trace_top)
+        print(f"\nTrace saved to {args.trace}")
+
+    print("\n" + "=" * 50)
+    print("Pipeline complete!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Sprite Build Trace - Opt-in per-stage timing for the normalizers, saved as a
+Chrome trace (chrome://tracing or ui.perfetto.dev) plus a slowest-first summary.
+Enabled with --trace out.json on sprite_pipeline.py and every normalize_sprites*.py.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+class Tracer:
+    """
+    Collects complete ('X') trace events with microsecond timestamps.
+    Stage events are tagged with the sprite currently open via sprite().
+    A disabled tracer records nothing, so stages can be wrapped unconditionally.
+    Worker processes trace into their own Tracer and return its events, which
+    the parent adds with extend(); perf_counter is system-wide, so they line up.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.events = []
+        self.current = None
+
+    @contextmanager
+    def span(self, name, category='stage', **args):
+        """Time the enclosed block as one event."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start / 1000,
+                'dur': (time.perf_counter_ns() - start) / 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': dict(args, sprite=self.current) if self.current and category == 'stage' else args
+            })
+
+    @contextmanager
+    def sprite(self, input_path):
+        """Time everything done for one source sprite and tag its stages with it."""
+        label = sprite_label(input_path)
+        previous, self.current = self.current, label
+        try:
+            with self.span(label, category='sprite'):
+                yield
+        finally:
+            self.current = previous
+
+    def extend(self, events):
+        """Add events recorded elsewhere, e.g. in a worker process."""
+        if self.enabled:
+            self.events.extend(events)
+
+    def save(self, path):
+        """Write the trace in Chrome's JSON object format."""
+        main_pid = os.getpid()
+        names = [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                  'args': {'name': 'main' if pid == main_pid else f"worker {pid}"}}
+                 for pid in sorted({event['pid'] for event in self.events})]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': names + self.events, 'displayTimeUnit': 'ms'}, f)
+
+    def print_summary(self, top=10):
+        """Print time per stage and the slowest sprites with their biggest stages."""
+        sprites = [event for event in self.events if event['cat'] == 'sprite']
+        stages = [event for event in self.events if event['cat'] == 'stage']
+        if not stages:
+            print("\nTrace: no sprites were processed")
+            return
+
+        totals = {}
+        for event in stages:
+            total, count, longest = totals.get(event['name'], (0.0, 0, 0.0))
+            totals[event['name']] = (total + event['dur'], count + 1, max(longest, event['dur']))
+        stage_time = sum(total for total, _, _ in totals.values())
+
+        print(f"\nTrace: {len({event['name'] for event in sprites})} sprite(s), "
+              f"{stage_time / 1000:.1f} ms in stages")
+        print("  Stages:")
+        for name, (total, count, longest) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            print(f"    {name:<8} {total / 1000:9.1f} ms {100 * total / stage_time:5.1f}%  "
+                  f"({count} calls, slowest {longest / 1000:.1f} ms)")
+
+        by_sprite = {}
+        for event in stages:
+            sprite_stages = by_sprite.setdefault(event['args'].get('sprite'), {})
+            sprite_stages[event['name']] = sprite_stages.get(event['name'], 0.0) + event['dur']
+
+        # A sprite can be opened more than once, e.g. a reference decoded up front
+        sprite_totals = {}
+        for event in sprites:
+            sprite_totals[event['name']] = sprite_totals.get(event['name'], 0.0) + event['dur']
+
+        print("  Slowest sprites:")
+        for label, total in sorted(sprite_totals.items(), key=lambda item: -item[1])[:top]:
+            breakdown = sorted(by_sprite.get(label, {}).items(), key=lambda item: -item[1])[:3]
+            detail = ', '.join(f"{name} {dur / 1000:.1f}" for name, dur in breakdown)
+            print(f"    {label:<32} {total / 1000:8.1f} ms  ({detail})")
+
+NULL_TRACER = Tracer(enabled=False)
+
+def sprite_label(input_path):
+    """Name a sprite by its source folder and file, so characters' poses don't collide."""
+    return os.path.join(os.path.basename(os.path.dirname(input_path)), os.path.basename(input_path))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Sprite Watcher
+Polls the source sprites and re-normalizes only the ones that changed (the v3
+outputs, built by sprite_pipeline.py's 'cross' profile through the build
+cache, overrides included). Run it next to `simple_server.py --live-reload`,
+which pushes each rebuilt sprite to every open page.
+Editing the reference sprite rebuilds everything, since it sets the shared height.
+"""
+
+import os
+import time
+import argparse
+from sprite_pipeline import ENCODE_PROFILES, DEFAULT_ENCODE, RESAMPLE_PROFILES, DEFAULT_RESAMPLE, run_pipeline
+from normalize_sprites_v3 import CHARACTERS, CROSS_PROFILE, REFERENCE_SPRITE
+from simple_server import POLL_INTERVAL, watch_files
+
+SOURCE_EXTENSIONS = ('.png',)
+
+def main():
+    """Bring the v3 sprites up to date, then rebuild changed sources until interrupted."""
+    parser = argparse.ArgumentParser(description="Re-normalize source sprites as they change")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL,
+                        help=f"seconds between polls of the source directories (default: {POLL_INTERVAL})")
+    parser.add_argument('--encode', choices=sorted(ENCODE_PROFILES), default=DEFAULT_ENCODE,
+                        help=f"output encoding (default: {DEFAULT_ENCODE})")
+    parser.add_argument('--resample', choices=sorted(RESAMPLE_PROFILES), default=DEFAULT_RESAMPLE,
+                        help=f"downscale strategy (default: {DEFAULT_RESAMPLE})")
+    args = parser.parse_args()
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    reference_path = os.path.join(base_dir, REFERENCE_SPRITE)
+
+    print("Sprite Watcher")
+    print("=" * 50)
+
+    characters = [input_dir for _, input_dir, _ in CHARACTERS if os.path.exists(os.path.join(base_dir, input_dir))]
+    if not characters or not os.path.exists(reference_path):
+        print("Error: Elon's standing.png not found!")
+        return
+
+    def rebuild():
+        """Run the cross profile over every character; the build cache skips unchanged sprites."""
+        run_pipeline(base_dir, [CROSS_PROFILE], encode=args.encode, resample=args.resample)
+
+    rebuild()
+    print("\n" + "=" * 50)
+    print(f"Watching {', '.join(characters)} (Ctrl+C to stop)")
+
+    try:
+        for files in watch_files(base_dir, characters, args.interval, SOURCE_EXTENSIONS):
+            start = time.perf_counter()
+            print(f"\nChanged: {', '.join(files)}")
+            rebuild()
+            print(f"\nRebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        print("\nWatcher stopped")
+
+if __name__ == "__main__":
+    main()